@@ -0,0 +1,82 @@
+"""
+Cross-user memoization of analysis results.
+
+Analyses are keyed on content hashes plus the prompt version, so any user
+submitting the same resume and job description reuses an earlier model output.
+Recent results live in an in-process LRU with a TTL; older ones are looked up
+in the analyses collection regardless of which user produced them.
+"""
+import datetime
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .models.resume import ResumeAnalysis, CachedAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """LRU + TTL cache of (resume_hash, jd_hash, prompt_version) -> analysis result."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "AnalysisCache":
+        """Build a cache from ANALYSIS_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("ANALYSIS_CACHE_ENTRIES", 512)),
+            ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    async def get(self, resume_hash: str, jd_hash: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis result, or None on a miss."""
+        key = (resume_hash, jd_hash, prompt_version)
+        entry = self._entries.get(key)
+
+        if entry:
+            stored_at, result = entry
+            if time.monotonic() - stored_at <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._entries[key]
+
+        try:
+            cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.ttl_seconds)
+            doc = await ResumeAnalysis.find_one(
+                ResumeAnalysis.resume_hash == resume_hash,
+                ResumeAnalysis.jd_hash == jd_hash,
+                ResumeAnalysis.prompt_version == prompt_version,
+                ResumeAnalysis.created_at >= cutoff,
+                projection_model=CachedAnalysisResult,
+            )
+            if doc:
+                self.put(resume_hash, jd_hash, prompt_version, doc.analysis_result)
+                self.hits += 1
+                return doc.analysis_result
+        except Exception as e:
+            logger.error(f"Error reading analysis cache: {e}")
+
+        self.misses += 1
+        return None
+
+    def put(self, resume_hash: str, jd_hash: str, prompt_version: str, result: Dict[str, Any]):
+        """Remember an analysis result, evicting the least recently used entry when full."""
+        key = (resume_hash, jd_hash, prompt_version)
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,184 @@
+"""
+Background jobs for resume analysis.
+
+Submitting an analysis returns a job id straight away; the download,
+extraction, model call and indexing run as a task in this process and report
+each stage as an event. Clients follow progress over SSE or poll the job
+status instead of holding a connection open for the whole analysis.
+
+Jobs live in the worker that accepted them, so with several workers the
+status and events endpoints need sticky routing (or the client falls back to
+/analysis/get-analysis once the job is done).
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Stages reported by an analysis job, in order
+STAGES = ("downloaded", "extracted", "analyzed", "indexed")
+
+
+class AnalysisJob:
+    """State and event log of one analysis job."""
+
+    def __init__(self, job_id: str, user_id: str):
+        self.id = job_id
+        self.user_id = user_id
+        self.status = "running"
+        self.stage: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def _emit(self, event: str, data: Dict[str, Any]):
+        self.events.append({"event": event, "data": data})
+        # Wake everyone following the job, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def progress(self, stage: str, data: Optional[Dict[str, Any]] = None):
+        """Record that the job reached a stage."""
+        self.stage = stage
+        self._emit(stage, data or {})
+
+    def complete(self, result: Dict[str, Any]):
+        self.status = "completed"
+        self.result = result
+        self.finished_at = time.monotonic()
+        self._emit("done", result)
+
+    def fail(self, status_code: int, detail: str):
+        self.status = "failed"
+        self.error = {"status_code": status_code, "error": detail}
+        self.finished_at = time.monotonic()
+        self._emit("error", self.error)
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event so far, then new ones until the job finishes."""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class AnalysisJobs:
+    """
+    Registry of running and recently finished analysis jobs.
+
+    Args:
+        max_finished: Finished jobs kept for status lookups before the oldest are dropped
+        finished_ttl: Seconds a finished job stays available
+    """
+
+    def __init__(self, max_finished: int = 1000, finished_ttl: float = 15 * 60):
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._by_key: Dict[Hashable, str] = {}
+
+    @classmethod
+    def from_env(cls) -> "AnalysisJobs":
+        """Build a registry from ANALYSIS_JOBS_* environment variables."""
+        return cls(
+            max_finished=int(os.getenv("ANALYSIS_JOBS_MAX_FINISHED", 1000)),
+            finished_ttl=float(os.getenv("ANALYSIS_JOBS_TTL_SECONDS", 15 * 60)),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {"running": len(self._tasks), "finished": len(self._finished)}
+
+    def _prune(self):
+        now = time.monotonic()
+        while self._finished:
+            job_id = next(iter(self._finished))
+            job = self._jobs[job_id]
+            if len(self._finished) <= self.max_finished and now - job.finished_at <= self.finished_ttl:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def get(self, job_id: str, user_id: str) -> Optional[AnalysisJob]:
+        """Return a job owned by ``user_id``, or None."""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def submit(
+        self,
+        key: Hashable,
+        user_id: str,
+        fn: Callable[[AnalysisJob], Awaitable[Dict[str, Any]]],
+    ) -> AnalysisJob:
+        """
+        Start ``fn(job)`` in the background and return its job.
+
+        A submission with the same key as a running job returns that job
+        instead of starting another, so double-clicks and retries share work.
+        """
+        self._prune()
+
+        running = self._by_key.get(key)
+        if running is not None:
+            return self._jobs[running]
+
+        job = AnalysisJob(uuid.uuid4().hex, user_id)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        self._tasks[job.id] = asyncio.create_task(self._run(key, job, fn))
+        return job
+
+    async def _run(self, key: Hashable, job: AnalysisJob, fn):
+        try:
+            job.complete(await fn(job))
+        except HTTPException as e:
+            job.fail(e.status_code, str(e.detail))
+        except asyncio.CancelledError:
+            job.fail(503, "Server shutting down")
+            raise
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {e}")
+            job.fail(500, str(e))
+        finally:
+            self._by_key.pop(key, None)
+            self._tasks.pop(job.id, None)
+            self._finished[job.id] = None
+
+    async def shutdown(self):
+        """Cancel running jobs."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
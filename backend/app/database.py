@@ -3,8 +3,22 @@ from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional
 from .models.user import User
-from .models.resume import ResumeAnalysis
-from .models.chat import ChatMessage
+from .models.resume import ResumeAnalysis, AnalysisCounter
+from .models.chat import ChatMessage, ChatSessionState
+from .models.extraction import ExtractedText
+from .models.content import ResumeText, JobDescriptionText
+
+DOCUMENT_MODELS = [
+    User,
+    ResumeAnalysis,
+    ChatMessage,
+    ExtractedText,
+    ChatSessionState,
+    AnalysisCounter,
+    ResumeText,
+    JobDescriptionText,
+]
+
 
 class MongoDB:
     client: Optional[AsyncIOMotorClient] = None
@@ -31,7 +45,9 @@ class MongoDB:
             # Initialize Beanie with document models
             await init_beanie(
                 database=cls.database,
-                document_models=[User, ResumeAnalysis,ChatMessage]
+                # Indexes are only ever added here; changing an existing one, such as
+                # the unique analysis pair index, goes through a script in migrations/
+                document_models=DOCUMENT_MODELS,
             )
             
             print(f"✅ Successfully connected to MongoDB database: {db_name}")
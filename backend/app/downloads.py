@@ -0,0 +1,154 @@
+"""
+Pooled, size-capped file downloads with URL-keyed caching.
+
+One httpx client lives for the whole app so uploads reuse TCP/TLS connections.
+Bodies are streamed and abandoned as soon as they exceed the size cap, and
+files we already hold are revalidated with If-None-Match / If-Modified-Since
+instead of being fetched again.
+"""
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadTooLargeError(ValueError):
+    """Raised when a download exceeds the configured byte limit."""
+
+
+class _CachedFile:
+    __slots__ = ("content", "etag", "last_modified")
+
+    def __init__(self, content: bytes, etag: Optional[str], last_modified: Optional[str]):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class FileDownloader:
+    """Download files over a shared connection pool with a size cap and LRU cache."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        max_bytes: int = 10 * 1024 * 1024,
+        cache_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.client = client
+        self.max_bytes = max_bytes
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        self._cached_bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "FileDownloader":
+        """Build a downloader and its connection pool from DOWNLOAD_* environment variables."""
+        client = httpx.AsyncClient(
+            timeout=float(os.getenv("DOWNLOAD_TIMEOUT_SECONDS", 30)),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("DOWNLOAD_MAX_CONNECTIONS", 20)),
+                max_keepalive_connections=int(os.getenv("DOWNLOAD_MAX_KEEPALIVE", 10)),
+            ),
+            follow_redirects=True,
+        )
+        max_bytes = os.getenv("DOWNLOAD_MAX_BYTES", os.getenv("PDF_MAX_BYTES", 10 * 1024 * 1024))
+        return cls(
+            client,
+            max_bytes=int(max_bytes),
+            cache_bytes=int(os.getenv("DOWNLOAD_CACHE_BYTES", 64 * 1024 * 1024)),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "cached_files": len(self._cache),
+            "cached_bytes": self._cached_bytes,
+        }
+
+    def _store(self, url: str, entry: _CachedFile):
+        if len(entry.content) > self.cache_bytes:
+            return
+
+        old = self._cache.pop(url, None)
+        if old:
+            self._cached_bytes -= len(old.content)
+
+        self._cache[url] = entry
+        self._cached_bytes += len(entry.content)
+
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted.content)
+
+    async def fetch(self, url: str) -> bytes:
+        """
+        Return the body at ``url``, using the cache when the file is unchanged.
+
+        Cached entries with an ETag or Last-Modified header are revalidated with a
+        conditional request. Entries without validators are served directly, since
+        upload URLs point at immutable files.
+
+        Raises:
+            DownloadTooLargeError: If the body exceeds ``max_bytes``
+            httpx.HTTPError: On network or HTTP status errors
+        """
+        cached = self._cache.get(url)
+        headers = {}
+
+        if cached:
+            self._cache.move_to_end(url)
+            if not cached.etag and not cached.last_modified:
+                self.hits += 1
+                return cached.content
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if cached and response.status_code == 304:
+                self.revalidated += 1
+                return cached.content
+
+            response.raise_for_status()
+
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > self.max_bytes:
+                raise DownloadTooLargeError(
+                    f"File is {length} bytes; the limit is {self.max_bytes} bytes."
+                )
+
+            chunks = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise DownloadTooLargeError(
+                        f"File exceeds the {self.max_bytes} byte limit."
+                    )
+                chunks.append(chunk)
+
+            content = b"".join(chunks)
+            self.misses += 1
+            self._store(
+                url,
+                _CachedFile(
+                    content,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                ),
+            )
+            return content
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,183 @@
+"""
+Persistent, content-addressed cache in front of the embedding model.
+
+Chunks are keyed by a hash of their text and the model configuration, so a
+job description shared by many users or boilerplate resume sections are only
+embedded once. Vectors live in a SQLite file as packed float arrays.
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated chunks from a SQLite cache.
+
+    Args:
+        inner: Embeddings that compute vectors on a miss
+        path: SQLite file holding the cache
+        namespace: Model configuration the vectors belong to
+        max_entries: Cached vectors kept before least recently used ones are evicted
+        dtype: "float32" or "float16" (half the disk, slightly rounded vectors)
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        path: str,
+        namespace: str,
+        max_entries: int = 200_000,
+        dtype: str = "float32",
+    ):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported cache dtype: {dtype}")
+
+        self.inner = inner
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        # Kept up to date by _store, so writes never count the table
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    @property
+    def model_name(self) -> str:
+        return self.inner.model_name
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode()).hexdigest()
+
+    def _pack(self, vector: List[float]) -> bytes:
+        if self.dtype == "float16":
+            import numpy as np
+
+            return np.asarray(vector, dtype=np.float16).tobytes()
+        return array("f", vector).tobytes()
+
+    def _unpack(self, blob: bytes) -> List[float]:
+        if self.dtype == "float16":
+            import numpy as np
+
+            return np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+        return array("f", blob).tolist()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update((key, self._unpack(blob)) for key, blob in rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        now = time.time()
+        with self._lock:
+            # A key already present holds the same vector, so only its use is refreshed
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, self._pack(vector), now) for key, vector in items.items()],
+            ).rowcount
+            if inserted < len(items):
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in items],
+                )
+            self._count += inserted
+
+            if self._count > self.max_entries:
+                # Other processes may share the file; recount before evicting, and
+                # evict down to 90% so this happens once per many writes
+                (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+                if self._count > self.max_entries:
+                    deleted = self._conn.execute(
+                        "DELETE FROM embeddings WHERE key IN ("
+                        "SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (self._count - int(self.max_entries * 0.9),),
+                    ).rowcount
+                    self._count -= deleted
+            self._conn.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        try:
+            cached = self._lookup(keys)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            cached = {}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = self.inner.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            try:
+                self._store(computed)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing embedding cache: {e}")
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,186 @@
+"""
+Embedding sidecar shared by all uvicorn workers.
+
+One process loads the embedding model (with micro-batching and the on-disk
+cache) and serves embed requests over a Unix domain socket. Workers started
+with EMBEDDING_MODE=remote use RemoteEmbeddings as a thin client, so adding
+workers does not add copies of the model.
+
+Run the sidecar (from the backend directory):
+    python -m app.embedding_server
+
+Wire format, both directions: 4-byte big-endian length + payload.
+Request: JSON {"texts": [...]}.
+Response: JSON header {"ok": true, "n": rows, "dim": cols} followed by a second
+frame of packed float32 values, or {"ok": false, "error": "..."}.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from array import array
+from itertools import chain
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("!I")
+
+
+def default_socket_path() -> str:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.getenv("EMBEDDING_SOCKET", os.path.join(backend_dir, "data", "embeddings.sock"))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, size)
+
+
+def _frame(payload: bytes) -> bytes:
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class RemoteEmbeddings(Embeddings):
+    """
+    Embeddings client for the sidecar.
+
+    Each thread keeps its own connection; a broken connection is reopened once
+    before the error is raised.
+    """
+
+    def __init__(self, socket_path: str, model_name: str, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def wait_until_available(self, timeout: float = 300.0):
+        """Block until the sidecar accepts connections."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._connect().close()
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = self._local.sock = self._connect()
+
+        sock.sendall(_frame(json.dumps({"texts": texts}).encode()))
+        header = json.loads(_recv_frame(sock))
+        if not header["ok"]:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+
+        flat = array("f", _recv_frame(sock))
+        dim = header["dim"]
+        return [flat[i * dim:(i + 1) * dim].tolist() for i in range(header["n"])]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        try:
+            return self._request(list(texts))
+        except OSError:
+            self.close()
+            return self._request(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+
+async def _handle(embeddings: Embeddings, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                (size,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                request = json.loads(await reader.readexactly(size))
+            except asyncio.IncompleteReadError:
+                return
+
+            try:
+                # Concurrent connections land in the same micro-batches
+                vectors = await embeddings.aembed_documents(request["texts"])
+            except Exception as e:
+                logger.error(f"Embedding request failed: {e}")
+                writer.write(_frame(json.dumps({"ok": False, "error": str(e)}).encode()))
+                await writer.drain()
+                continue
+
+            dim = len(vectors[0]) if vectors else 0
+            header = {"ok": True, "n": len(vectors), "dim": dim}
+            writer.write(_frame(json.dumps(header).encode()))
+            writer.write(_frame(array("f", chain.from_iterable(vectors)).tobytes()))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str):
+    from .embeddings import get_local_embeddings
+
+    embeddings = await asyncio.to_thread(get_local_embeddings)
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = await asyncio.start_unix_server(
+        lambda r, w: _handle(embeddings, r, w), path=socket_path
+    )
+    os.chmod(socket_path, 0o600)
+    logger.info(f"Embedding server for {embeddings.model_name} listening on {socket_path}")
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "info").upper())
+    asyncio.run(serve(default_socket_path()))
+
+
+if __name__ == "__main__":
+    main()
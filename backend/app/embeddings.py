@@ -0,0 +1,313 @@
+"""
+Embedding service with cross-request micro-batching and selectable backends.
+
+Every embed call, from any thread or the event loop, is funnelled into one
+batching thread. It gathers texts until the batch is full or the wait window
+closes, runs a single forward pass and hands each caller its slice.
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from .embedding_cache import CachedEmbeddings
+
+logger = logging.getLogger(__name__)
+
+# Short names accepted by EMBEDDING_MODEL
+EMBEDDING_MODELS: Dict[str, str] = {
+    "bge-large": "BAAI/bge-large-en-v1.5",
+    "bge-base": "BAAI/bge-base-en-v1.5",
+    "bge-small": "BAAI/bge-small-en-v1.5",
+}
+
+DEFAULT_MODEL = "bge-large"
+
+
+def resolve_model_name(name: str) -> str:
+    """Map a short model name to its Hugging Face id; full ids pass through."""
+    return EMBEDDING_MODELS.get(name, name)
+
+
+def resolve_onnx_file(backend: str, onnx_file: Optional[str] = None) -> Optional[str]:
+    """ONNX file a backend loads; None for torch or the repo's default model.onnx."""
+    if backend == "torch":
+        return None
+    if backend == "onnx-int8" and not onnx_file:
+        return "onnx/model_qint8_avx512.onnx"
+    return onnx_file
+
+
+def load_sentence_transformer(
+    model_name: str,
+    backend: str = "torch",
+    onnx_file: Optional[str] = None,
+    dtype: str = "float32",
+    threads: Optional[int] = None,
+):
+    """
+    Load a SentenceTransformer for CPU inference.
+
+    Args:
+        model_name: Short name from EMBEDDING_MODELS or a Hugging Face id
+        backend: "torch", "onnx" or "onnx-int8"
+        onnx_file: ONNX file inside the model repo, e.g. "onnx/model_qint8_avx512.onnx"
+        dtype: "float32" or "float16" weights (torch backend only)
+        threads: Intra-op threads for inference; defaults to the library's choice
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs = {}
+
+    if backend == "torch":
+        import torch
+
+        if threads:
+            torch.set_num_threads(threads)
+        if dtype == "float16":
+            model_kwargs["torch_dtype"] = torch.float16
+        return SentenceTransformer(
+            resolve_model_name(model_name), device="cpu", model_kwargs=model_kwargs
+        )
+
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    onnx_file = resolve_onnx_file(backend, onnx_file)
+    if onnx_file:
+        model_kwargs["file_name"] = onnx_file
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = session_options
+
+    return SentenceTransformer(
+        resolve_model_name(model_name),
+        device="cpu",
+        backend="onnx",
+        model_kwargs=model_kwargs,
+    )
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    LangChain embeddings that coalesce concurrent calls into micro-batches.
+
+    Args:
+        model: Loaded SentenceTransformer
+        model_name: Hugging Face id of the model, used to pick the collection
+        max_batch_size: Most texts encoded in one forward pass
+        max_wait_ms: How long to hold a partial batch open for more callers
+        normalize: Whether to L2-normalize vectors
+    """
+
+    def __init__(
+        self,
+        model,
+        model_name: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        normalize: bool = False,
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.normalize = normalize
+        self.batches = 0
+        self.texts = 0
+        self._requests: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0,
+        }
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        pending = [self._requests.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+
+        return pending
+
+    def _run(self):
+        while True:
+            # Callers cancelled while queued are dropped; the rest can no longer
+            # be cancelled, so handing them results below cannot fail
+            pending = [
+                (item, future)
+                for item, future in self._collect()
+                if future.set_running_or_notify_cancel()
+            ]
+            if not pending:
+                continue
+
+            texts = [text for item, _ in pending for text in item]
+            try:
+                vectors = self.model.encode(
+                    texts,
+                    batch_size=self.max_batch_size,
+                    normalize_embeddings=self.normalize,
+                    convert_to_numpy=True,
+                ).tolist()
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {e}")
+                self._dispatch(pending, error=e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            self._dispatch(pending, vectors=vectors)
+
+    def _dispatch(
+        self,
+        pending: List[Tuple[List[str], Future]],
+        vectors: Optional[List[List[float]]] = None,
+        error: Optional[BaseException] = None,
+    ):
+        start = 0
+        for item, future in pending:
+            try:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(vectors[start:start + len(item)])
+            except Exception as e:
+                # One bad hand-off must not take down the batching thread
+                logger.error(f"Error delivering embeddings: {e}")
+            finally:
+                start += len(item)
+
+    def _submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        if not texts:
+            future.set_result([])
+        else:
+            # Same preprocessing as HuggingFaceEmbeddings, which built the existing vectors
+            self._requests.put(([text.replace("\n", " ") for text in texts], future))
+        return future
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._submit(texts).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._submit([text]).result()[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.wrap_future(self._submit(texts))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await asyncio.wrap_future(self._submit([text])))[0]
+
+
+def get_embeddings() -> Embeddings:
+    """
+    Build the embeddings used by the vector store.
+
+    With EMBEDDING_MODE=remote the model lives in the shared sidecar
+    (app.embedding_server) and this process only holds a socket client.
+    """
+    if os.getenv("EMBEDDING_MODE", "local") == "remote":
+        from .embedding_server import RemoteEmbeddings, default_socket_path
+
+        embeddings = RemoteEmbeddings(
+            default_socket_path(),
+            model_name=resolve_model_name(os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)),
+            timeout=float(os.getenv("EMBEDDING_REMOTE_TIMEOUT_SECONDS", 60)),
+        )
+        # Counts toward warm-up, so readiness waits for the sidecar too
+        embeddings.wait_until_available()
+        return embeddings
+
+    return get_local_embeddings()
+
+
+def get_local_embeddings() -> Embeddings:
+    """Build the in-process embedding service from EMBEDDING_* environment variables."""
+    model_name = os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    backend = os.getenv("EMBEDDING_BACKEND", "torch")
+    dtype = os.getenv("EMBEDDING_DTYPE", "float32")
+    normalize = os.getenv("EMBEDDING_NORMALIZE", "false").lower() == "true"
+    threads = os.getenv("EMBEDDING_THREADS")
+    onnx_file = resolve_onnx_file(backend, os.getenv("EMBEDDING_ONNX_FILE"))
+
+    model = load_sentence_transformer(
+        model_name,
+        backend=backend,
+        onnx_file=onnx_file,
+        dtype=dtype,
+        threads=int(threads) if threads else None,
+    )
+
+    embeddings = BatchingEmbeddings(
+        model,
+        model_name=resolve_model_name(model_name),
+        max_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", 32)),
+        max_wait_ms=float(os.getenv("EMBEDDING_MAX_WAIT_MS", 10)),
+        normalize=normalize,
+    )
+
+    if os.getenv("EMBEDDING_CACHE", "true").lower() != "true":
+        return embeddings
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache_path = os.getenv(
+        "EMBEDDING_CACHE_PATH",
+        os.path.join(backend_dir, "data", "embedding_cache.sqlite3"),
+    )
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Different ONNX files (e.g. avx2 vs avx512 quantisations) give different vectors
+    model_id = f"{backend}[{onnx_file}]" if onnx_file else backend
+
+    return CachedEmbeddings(
+        embeddings,
+        path=cache_path,
+        # "nl" marks vectors computed with newlines folded to spaces; entries cached
+        # before that are never read again and age out of the LRU
+        namespace=f"{embeddings.model_name}:{model_id}:{dtype}:{normalize}:nl",
+        max_entries=int(os.getenv("EMBEDDING_CACHE_ENTRIES", 200_000)),
+        dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float32"),
+    )
+
+
+def collection_name_for(model_name: str) -> str:
+    """
+    Chroma collection for a model's vectors.
+
+    Models produce vectors of different sizes, so only the original model keeps
+    the original "resumes" collection.
+    """
+    model_name = resolve_model_name(model_name)
+    if model_name == EMBEDDING_MODELS[DEFAULT_MODEL]:
+        return "resumes"
+    return "resumes_" + model_name.split("/")[-1].replace(".", "_")
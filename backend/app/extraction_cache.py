@@ -0,0 +1,138 @@
+"""
+Content-addressed cache of extracted PDF text.
+
+Maps a hash of the raw PDF bytes to the extracted text and its resume_hash, so
+resubmitting the same file skips parsing. An in-process LRU of texts sits in
+front of a Mongo collection that only records the resume_hash; the text itself
+is read from the text store, which keeps one copy per resume. The memory tier
+is bounded by the bytes of text it holds, the Mongo tier by its entry count.
+"""
+import datetime
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .models.extraction import ExtractedText
+from .pdf_extraction import EXTRACTION_VERSION
+from .text_store import get_resume_text
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """Two-tier (memory, Mongo) cache of PDF bytes hash -> (resume_text, resume_hash)."""
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_persistent_entries: int = 100_000,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_persistent_entries = max_persistent_entries
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCache":
+        """Build a cache from EXTRACTION_CACHE_* environment variables."""
+        return cls(
+            max_memory_bytes=int(os.getenv("EXTRACTION_CACHE_MEMORY_BYTES", 32 * 1024 * 1024)),
+            max_persistent_entries=int(os.getenv("EXTRACTION_CACHE_PERSISTENT_ENTRIES", 100_000)),
+        )
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        """Content address for raw file bytes under the current extraction version."""
+        return hashlib.sha256(f"{EXTRACTION_VERSION}\0".encode() + data).hexdigest()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._entries),
+            "memory_bytes": self._memory_bytes,
+        }
+
+    def _remember(self, file_hash: str, resume_text: str, resume_hash: str):
+        if file_hash in self._entries:
+            self._entries.move_to_end(file_hash)
+            return
+
+        size = len(resume_text.encode())
+        if size > self.max_memory_bytes:
+            return
+
+        self._entries[file_hash] = (resume_text, resume_hash)
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (text, _) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(text.encode())
+
+    async def get(self, file_hash: str) -> Optional[Tuple[str, str]]:
+        """Return (resume_text, resume_hash) for a file hash, or None on a miss."""
+        if file_hash in self._entries:
+            self._entries.move_to_end(file_hash)
+            self.memory_hits += 1
+            return self._entries[file_hash]
+
+        try:
+            doc = await ExtractedText.find_one(ExtractedText.file_hash == file_hash)
+            # The text is stored with the first analysis of the resume; until then
+            # the file is parsed again
+            resume_text = await get_resume_text(doc.resume_hash) if doc else None
+            if resume_text is not None:
+                await doc.set({ExtractedText.last_used_at: datetime.datetime.utcnow()})
+                self._remember(file_hash, resume_text, doc.resume_hash)
+                self.persistent_hits += 1
+                return resume_text, doc.resume_hash
+        except Exception as e:
+            logger.error(f"Error reading extraction cache: {e}")
+
+        self.misses += 1
+        return None
+
+    async def put(self, file_hash: str, resume_text: str, resume_hash: str):
+        """Store an extraction in both tiers, evicting least recently used entries."""
+        self._remember(file_hash, resume_text, resume_hash)
+
+        try:
+            now = datetime.datetime.utcnow()
+            await ExtractedText.find_one(ExtractedText.file_hash == file_hash).upsert(
+                {"$set": {ExtractedText.last_used_at: now}},
+                on_insert=ExtractedText(
+                    file_hash=file_hash,
+                    resume_hash=resume_hash,
+                    created_at=now,
+                    last_used_at=now,
+                ),
+            )
+            await self._evict_persistent()
+        except Exception as e:
+            logger.error(f"Error writing extraction cache: {e}")
+
+    async def _evict_persistent(self):
+        # Collection metadata, not a scan; most writes stop here
+        collection = ExtractedText.get_motor_collection()
+        excess = await collection.estimated_document_count() - self.max_persistent_entries
+        if excess <= 0:
+            return
+
+        # Walk the last_used_at index to the newest entry that has to go, then
+        # remove it and everything older in one delete
+        cutoff = (
+            await collection.find({}, {"last_used_at": 1})
+            .sort("last_used_at", 1)
+            .skip(excess - 1)
+            .limit(1)
+            .to_list(1)
+        )
+        if cutoff:
+            await collection.delete_many({"last_used_at": {"$lte": cutoff[0]["last_used_at"]}})
@@ -0,0 +1,303 @@
+"""
+Background indexing of analyses into the vector store.
+
+Embedding resume and job description chunks takes seconds on CPU, so the
+analyze endpoint only enqueues the work. Progress is persisted on
+ResumeAnalysis.index_status so any worker can tell whether vectors exist.
+
+Workers claim a job atomically before running it, so when several processes
+recover unfinished jobs each one is indexed once. Failed jobs are retried a
+bounded number of times with exponential backoff.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import socket
+import uuid
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from .models.resume import ResumeAnalysis, IndexStatus, IndexStatusView
+from .text_store import get_texts
+from .utils import add_to_vector_store
+from .warmup import BackgroundResource
+
+logger = logging.getLogger(__name__)
+
+JobKey = Tuple[str, str, str]
+
+
+class IndexingQueue:
+    """Queue of vector store indexing jobs processed by background workers."""
+
+    def __init__(
+        self,
+        vector_store_loader: BackgroundResource,
+        workers: int = 1,
+        wait_timeout: float = 30.0,
+        stale_after: float = 300.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 60.0,
+        sweep_interval: float = 60.0,
+        recover_batch: int = 50,
+    ):
+        self.vector_store_loader = vector_store_loader
+        self.workers = workers
+        self.wait_timeout = wait_timeout
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.sweep_interval = sweep_interval
+        self.recover_batch = recover_batch
+        # Identifies this queue's claims among all worker processes
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: "asyncio.Queue[Tuple[JobKey, ResumeAnalysis, str, Optional[str], Optional[str]]]" = asyncio.Queue()
+        self._pending: Dict[JobKey, asyncio.Future] = {}
+        self._tasks = []
+
+    @classmethod
+    def from_env(cls, vector_store_loader: BackgroundResource) -> "IndexingQueue":
+        """Build a queue from INDEXING_* environment variables."""
+        return cls(
+            vector_store_loader,
+            workers=int(os.getenv("INDEXING_WORKERS", 1)),
+            wait_timeout=float(os.getenv("INDEXING_WAIT_SECONDS", 30)),
+            stale_after=float(os.getenv("INDEXING_STALE_SECONDS", 300)),
+            max_attempts=int(os.getenv("INDEXING_MAX_ATTEMPTS", 3)),
+            retry_backoff=float(os.getenv("INDEXING_RETRY_SECONDS", 60)),
+            sweep_interval=float(os.getenv("INDEXING_SWEEP_SECONDS", 60)),
+        )
+
+    @staticmethod
+    def key(user_id: str, resume_hash: str, jd_hash: str) -> JobKey:
+        return (user_id, resume_hash, jd_hash)
+
+    def start(self):
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(
+        self,
+        analysis: ResumeAnalysis,
+        file_name: str,
+        resume_text: Optional[str] = None,
+        job_description: Optional[str] = None,
+    ):
+        """
+        Schedule an inserted analysis for indexing without waiting for it.
+
+        Texts the caller already holds save a lookup; missing ones are read
+        from the analysis or the text store when the job runs.
+        """
+        key = self.key(analysis.user_id, analysis.resume_hash, analysis.jd_hash)
+        if key in self._pending:
+            return
+
+        self._pending[key] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((key, analysis, file_name, resume_text, job_description))
+
+    def _claim_fields(self, now: datetime.datetime) -> dict:
+        return {
+            "index_status": IndexStatus.INDEXING.value,
+            "index_owner": self.owner,
+            "index_claimed_at": now,
+        }
+
+    def _recoverable(self, now: datetime.datetime) -> dict:
+        cutoff = now - datetime.timedelta(seconds=self.stale_after)
+        return {
+            "$or": [
+                # Inserted but never picked up, e.g. the enqueuing worker stopped
+                {"index_status": IndexStatus.PENDING.value, "created_at": {"$lte": cutoff}},
+                # Claimed by a worker that stopped before finishing
+                {"index_status": IndexStatus.INDEXING.value, "index_claimed_at": {"$lte": cutoff}},
+                # Failed with attempts left and the backoff elapsed
+                {"index_status": IndexStatus.FAILED.value, "index_retry_at": {"$lte": now}},
+            ]
+        }
+
+    async def recover(self):
+        """
+        Claim and requeue jobs no worker is handling.
+
+        Runs at startup and every sweep_interval in each worker process; the
+        atomic claim means each job is requeued by one of them only.
+        """
+        now = datetime.datetime.utcnow()
+        collection = ResumeAnalysis.get_motor_collection()
+        claimed = 0
+        try:
+            while claimed < self.recover_batch:
+                doc = await collection.find_one_and_update(
+                    self._recoverable(now),
+                    {"$set": self._claim_fields(now)},
+                    sort=[("created_at", 1)],
+                    return_document=ReturnDocument.AFTER,
+                )
+                if doc is None:
+                    break
+                analysis = ResumeAnalysis.model_validate(doc)
+                self.enqueue(analysis, analysis.resume_filename)
+                claimed += 1
+        except Exception as e:
+            logger.error(f"Error claiming unfinished indexing jobs: {e}")
+
+        if claimed:
+            logger.info(f"Requeued {claimed} unfinished indexing jobs")
+
+    async def _sweeper(self):
+        # The first recover() runs from the app lifespan
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.recover()
+
+    async def _claim(self, analysis: ResumeAnalysis) -> Optional[int]:
+        """
+        Take a job for this worker, counting the attempt.
+
+        Returns:
+            int: attempts started including this one, or None if another worker holds the job
+        """
+        now = datetime.datetime.utcnow()
+        try:
+            doc = await ResumeAnalysis.get_motor_collection().find_one_and_update(
+                {
+                    "_id": analysis.id,
+                    "$or": [
+                        {"index_status": IndexStatus.PENDING.value},
+                        # Jobs recover() claimed for this queue
+                        {"index_status": IndexStatus.INDEXING.value, "index_owner": self.owner},
+                    ],
+                },
+                {"$set": self._claim_fields(now), "$inc": {"index_attempts": 1}},
+                projection={"index_attempts": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            logger.error(f"Error claiming indexing job: {e}")
+            return None
+        return None if doc is None else doc["index_attempts"]
+
+    async def _worker(self):
+        while True:
+            key, analysis, file_name, resume_text, job_description = await self._queue.get()
+            # On shutdown the job stays claimed and recover() picks it up once stale
+            attempts = await self._claim(analysis)
+            if attempts is None:
+                # Another worker process owns the job; waiters follow its persisted status
+                status = None
+            elif attempts > self.max_attempts:
+                logger.error(f"Giving up indexing {key} after {self.max_attempts} attempts")
+                status = IndexStatus.FAILED
+            else:
+                status = await self._index(key, analysis, file_name, resume_text, job_description)
+
+            if status is not None:
+                await self._finish(analysis, status, attempts)
+            future = self._pending.pop(key, None)
+            if future and not future.done():
+                future.set_result(None if status is None else status == IndexStatus.INDEXED)
+            self._queue.task_done()
+
+    async def _index(
+        self,
+        key: JobKey,
+        analysis: ResumeAnalysis,
+        file_name: str,
+        resume_text: Optional[str],
+        job_description: Optional[str],
+    ) -> IndexStatus:
+        try:
+            resume_text, job_description = await get_texts(
+                analysis.resume_hash,
+                analysis.jd_hash,
+                resume_text or analysis.resume_text,
+                job_description or analysis.job_description,
+            )
+            if resume_text is None or job_description is None:
+                raise ValueError("Analysis texts not found")
+
+            # Jobs queued during warm-up wait here until the store has loaded
+            vector_store = await self.vector_store_loader.get()
+            await asyncio.to_thread(
+                add_to_vector_store,
+                analysis.user_id,
+                file_name,
+                vector_store,
+                resume_text,
+                job_description,
+                analysis.resume_hash,
+                analysis.jd_hash,
+            )
+            return IndexStatus.INDEXED
+        except Exception as e:
+            logger.error(f"Indexing failed for {key}: {e}")
+            return IndexStatus.FAILED
+
+    async def _finish(self, analysis: ResumeAnalysis, status: IndexStatus, attempts: int):
+        update = {"index_status": status.value, "index_retry_at": None}
+        if status == IndexStatus.FAILED and attempts < self.max_attempts:
+            delay = self.retry_backoff * 2 ** (attempts - 1)
+            update["index_retry_at"] = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+
+        try:
+            # A job reclaimed as stale by another worker is theirs to finish
+            await ResumeAnalysis.get_motor_collection().update_one(
+                {"_id": analysis.id, "index_owner": self.owner},
+                {"$set": update},
+            )
+        except Exception as e:
+            logger.error(f"Error saving index status: {e}")
+
+    async def wait_until_indexed(
+        self, user_id: str, resume_hash: str, jd_hash: str, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Wait until vectors for an analysis exist.
+
+        Returns:
+            bool: True once indexed, False if indexing failed or did not finish in time
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        key = self.key(user_id, resume_hash, jd_hash)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        future = self._pending.get(key)
+        if future:
+            try:
+                indexed = await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                return False
+            if indexed is not None:
+                return indexed
+
+        # The job may be running in another worker process; poll its persisted status
+        while True:
+            try:
+                view = await ResumeAnalysis.find_one(
+                    ResumeAnalysis.user_id == user_id,
+                    ResumeAnalysis.resume_hash == resume_hash,
+                    ResumeAnalysis.jd_hash == jd_hash,
+                    projection_model=IndexStatusView,
+                )
+            except Exception as e:
+                logger.error(f"Error reading index status: {e}")
+                return False
+
+            if not view or view.index_status == IndexStatus.FAILED:
+                return False
+            if view.index_status in (None, IndexStatus.INDEXED):
+                return True
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.5)
@@ -0,0 +1,101 @@
+"""
+Bounded, async executor for LLM calls.
+
+Keeps slow model calls off the event loop, caps how many run at once and
+rejects new work with a 429 once the wait queue is full.
+"""
+import asyncio
+import logging
+import math
+import os
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class LLMExecutor:
+    """Run LLM calls with a concurrency cap, a bounded queue and per-call timeouts."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_queue: int = 16,
+        timeout: float = 60.0,
+        retry_after: int = 5,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMExecutor":
+        """Build an executor from LLM_* environment variables."""
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", 16)),
+            timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", 60)),
+            retry_after=int(os.getenv("LLM_RETRY_AFTER_SECONDS", 5)),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+    def _reject(self):
+        # Rough estimate: one timeout window per batch of queued calls ahead of us
+        batches = math.ceil((self._waiting + 1) / max(self.max_concurrency, 1))
+        retry_after = max(self.retry_after, batches * self.retry_after)
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis service is busy. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def ainvoke(self, model, messages: list, timeout: Optional[float] = None) -> Any:
+        """
+        Invoke a chat model asynchronously under the executor's limits.
+
+        Args:
+            model: LangChain chat model exposing ``ainvoke``
+            messages: Messages to send to the model
+            timeout: Optional per-call timeout overriding the default
+
+        Returns:
+            The model response
+
+        Raises:
+            HTTPException: 429 when the queue is full, 504 when the call times out
+        """
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._reject()
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            return await asyncio.wait_for(
+                model.ainvoke(messages), timeout=timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"LLM call timed out after {timeout or self.timeout}s")
+            raise HTTPException(
+                status_code=504, detail="Analysis timed out. Please try again."
+            )
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
@@ -6,11 +6,19 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 from .utils import *
 from .vector_store import get_vector_store
+from .llm_executor import LLMExecutor
+from .pdf_extraction import PDFExtractor
+from .extraction_cache import ExtractionCache
+from .downloads import FileDownloader
+from .analysis_cache import AnalysisCache
+from .indexing import IndexingQueue
+from .analysis_jobs import AnalysisJobs
+from .warmup import BackgroundResource
 from .database import mongodb
 from .webhooks import webhook_router
 from contextlib import asynccontextmanager
 from .router import user,analysis,chat,health
-from .middleware.authMiddleware import auth_middleware
+from .middleware.authMiddleware import AuthMiddleware, jwks_cache
 
 load_dotenv()
 api_key = os.getenv("GOOGLE_API_KEY")
@@ -20,27 +28,46 @@ if not api_key:
 
 # Global variables for LLM and vector store
 llm = None
-vector_store = None
+vector_store_loader = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global llm, vector_store
+    global llm, vector_store_loader
     
     # Initialize database connection
     await mongodb.connect_to_mongo()
     
-    # Initialize LLM and vector store once
+    # Initialize LLM once; the embedding model and Chroma load in the background
+    # unless WARMUP_MODE=eager, so the server can bind before they are ready
     llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
-    vector_store = get_vector_store()
+    vector_store_loader = BackgroundResource("Vector store", get_vector_store)
+    if os.getenv("WARMUP_MODE", "background") == "eager":
+        await vector_store_loader.get()
+    else:
+        vector_store_loader.start()
     
     # Store in app state for access by other modules
     app.state.llm = llm
-    app.state.vector_store = vector_store
+    app.state.vector_store_loader = vector_store_loader
+    app.state.llm_executor = LLMExecutor.from_env()
+    app.state.pdf_extractor = PDFExtractor.from_env()
+    app.state.extraction_cache = ExtractionCache.from_env()
+    app.state.downloader = FileDownloader.from_env()
+    app.state.analysis_cache = AnalysisCache.from_env()
+    app.state.indexer = IndexingQueue.from_env(vector_store_loader)
+    app.state.indexer.start()
+    await app.state.indexer.recover()
+    app.state.analysis_jobs = AnalysisJobs.from_env()
     
     yield
     
     # Shutdown
+    await app.state.analysis_jobs.shutdown()
+    await app.state.indexer.stop()
+    app.state.pdf_extractor.shutdown()
+    await app.state.downloader.aclose()
+    await jwks_cache.aclose()
     await mongodb.close_mongo_connection()
 
 
@@ -60,7 +87,7 @@ app.add_middleware(
 )
 
 # Add auth Middleware
-app.middleware("http")(auth_middleware)
+app.add_middleware(AuthMiddleware)
 
 # Include webhook router
 app.include_router(webhook_router)
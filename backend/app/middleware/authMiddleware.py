@@ -1,71 +1,143 @@
-import os
-from fastapi import Request
+import re
+from typing import Callable, Dict, Optional
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
-from jwt import PyJWKClient
-
-
-url = os.getenv("JWKS_ENDPOINT")
-
-if not url:
-    raise ValueError("JWKS_ENDPOINT environment variable is not set")
-
-jwks_client = PyJWKClient(url)
-
-
-async def auth_middleware(request: Request, call_next):
-    """Authentication middleware for JWT token validation"""
-
-    if request.method == "OPTIONS":
-        return await call_next(request)
-
-    # Skip authentication for certain paths
-    skip_paths = ["/webhooks", "/health", "/docs", "/redoc", "/openapi.json"]
-
-    if any(request.url.path.startswith(path) or request.url.path == '/' for path in skip_paths):
-        return await call_next(request)
-
-    auth_header = request.headers.get("Authorization")
-    token = None
-
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-
-    if not token:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Unauthorized: Missing or invalid token"},
-        )
-
-    signing_key = jwks_client.get_signing_key_from_jwt(token)
-
-    try:
-        # Verify JWT token with RSA public key
-        payload = jwt.decode(
-            token,
-            signing_key,
-            algorithms=["RS256"],
-        )
-        request.state._state['user_id'] = payload.get("sub")
-
-    except jwt.ExpiredSignatureError:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Token expired"},
-            headers={
-                "Access-Control-Allow-Origin": request.headers.get("origin", "*"),
-                "Access-Control-Allow-Credentials": "true",
-            },
-        )
-
-    except jwt.InvalidTokenError as e:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": f"Invalid token: {str(e)}"},
-            headers={
-                "Access-Control-Allow-Origin": request.headers.get("origin", "*"),
-                "Access-Control-Allow-Credentials": "true",
-            },
-        )
-
-    return await call_next(request)
+from .auth_cache import JWKSCache, VerifiedTokenCache
+
+
+# Signing keys are fetched asynchronously and cached by kid; tokens that
+# already passed verification are remembered until they expire
+jwks_cache = JWKSCache.from_env()
+verified_tokens = VerifiedTokenCache.from_env()
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Return the payload of a valid RS256 token.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid, expired or its signing key is unavailable
+    """
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    if not kid:
+        raise jwt.InvalidTokenError("Token header has no kid")
+
+    signing_key = await jwks_cache.get_signing_key(kid)
+
+    # Verify JWT token with RSA public key
+    payload = jwt.decode(
+        token,
+        signing_key,
+        algorithms=["RS256"],
+    )
+    verified_tokens.put(token, payload)
+    return payload
+
+
+# Per-route auth policies
+PUBLIC = "public"
+REQUIRED = "required"
+
+# Routes that differ from the default policy. Entries match the exact path or
+# anything below it ("/health" covers "/health/ready", not "/healthz");
+# "/" matches only the root.
+ROUTE_POLICIES = {
+    "/": PUBLIC,
+    "/webhooks": PUBLIC,
+    "/health": PUBLIC,
+    "/docs": PUBLIC,
+    "/redoc": PUBLIC,
+    "/openapi.json": PUBLIC,
+}
+
+
+def compile_route_policies(
+    policies: Dict[str, str], default: str = REQUIRED
+) -> Callable[[str], str]:
+    """Build a function mapping a request path to its policy with one regex match."""
+    exact = {path: policy for path, policy in policies.items() if path == "/"}
+    prefixes = sorted((path for path in policies if path != "/"), key=len, reverse=True)
+
+    if not prefixes:
+        return lambda path: exact.get(path, default)
+
+    # Longest prefix first, so nested rules win over their parents
+    pattern = re.compile(
+        "(?:" + "|".join(f"({re.escape(p)})" for p in prefixes) + ")(?:/|$)"
+    )
+    group_policies = [policies[p] for p in prefixes]
+
+    def policy_for(path: str) -> str:
+        policy = exact.get(path)
+        if policy is not None:
+            return policy
+        match = pattern.match(path)
+        if match is None:
+            return default
+        return group_policies[match.lastindex - 1]
+
+    return policy_for
+
+
+def _unauthorized(detail: str, origin: Optional[str] = None) -> JSONResponse:
+    headers = None
+    if origin is not None:
+        # Auth runs outside CORS, so rejected requests need the headers here
+        headers = {
+            "Access-Control-Allow-Origin": origin,
+            "Access-Control-Allow-Credentials": "true",
+        }
+    return JSONResponse(status_code=401, content={"detail": detail}, headers=headers)
+
+
+class AuthMiddleware:
+    """
+    ASGI middleware for JWT token validation.
+
+    Authenticated requests are handed to the app with the original receive
+    and send callables, so streamed responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, policies: Dict[str, str] = ROUTE_POLICIES):
+        self.app = app
+        self.policy_for = compile_route_policies(policies)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        if self.policy_for(scope["path"]) == PUBLIC:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        auth_header = headers.get("authorization")
+        token = None
+
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+
+        if not token:
+            response = _unauthorized("Unauthorized: Missing or invalid token")
+            return await response(scope, receive, send)
+
+        try:
+            payload = await verify_token(token)
+
+        except jwt.ExpiredSignatureError:
+            response = _unauthorized("Token expired", headers.get("origin", "*"))
+            return await response(scope, receive, send)
+
+        except jwt.InvalidTokenError as e:
+            response = _unauthorized(f"Invalid token: {str(e)}", headers.get("origin", "*"))
+            return await response(scope, receive, send)
+
+        # Read by routes as request.state._state["user_id"]
+        scope.setdefault("state", {})["user_id"] = payload.get("sub")
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,248 @@
+"""
+Caches that keep JWT verification off the network and out of the hot path.
+
+JWKSCache holds the provider's signing keys by kid, refreshes them in the
+background and refetches only when a token names a kid it has not seen.
+VerifiedTokenCache remembers tokens that already passed RS256 verification
+until they expire, so repeat calls from the same session skip the signature
+check.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSError(jwt.InvalidTokenError):
+    """Raised when no signing key can be found for a token."""
+
+
+class JWKSCache:
+    """
+    Async, kid-indexed cache of JWKS signing keys.
+
+    Args:
+        url: JWKS endpoint
+        client: HTTP client used to fetch the key set
+        ttl: Seconds fetched keys are trusted before a refresh is required
+        refresh_interval: Seconds between background refreshes
+        min_refetch_interval: Minimum seconds between fetches triggered by requests,
+            for unknown kids and after a failed refresh
+    """
+
+    def __init__(
+        self,
+        url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        ttl: float = 3600.0,
+        refresh_interval: float = 900.0,
+        min_refetch_interval: float = 30.0,
+    ):
+        self.url = url
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        # End of the last fetch attempt, successful or not, and how it failed
+        self._attempted_at: Optional[float] = None
+        self._last_error: Optional[Exception] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.fetches = 0
+
+    @classmethod
+    def from_env(cls) -> "JWKSCache":
+        """Build a cache for JWKS_ENDPOINT from JWKS_* environment variables."""
+        url = os.getenv("JWKS_ENDPOINT")
+
+        if not url:
+            raise ValueError("JWKS_ENDPOINT environment variable is not set")
+
+        return cls(
+            url,
+            httpx.AsyncClient(timeout=float(os.getenv("JWKS_TIMEOUT_SECONDS", 10))),
+            ttl=float(os.getenv("JWKS_TTL_SECONDS", 3600)),
+            refresh_interval=float(os.getenv("JWKS_REFRESH_SECONDS", 900)),
+            min_refetch_interval=float(os.getenv("JWKS_MIN_REFETCH_SECONDS", 30)),
+        )
+
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    async def _fetch(self):
+        response = await self.client.get(self.url)
+        response.raise_for_status()
+
+        keys = {}
+        for data in response.json().get("keys", []):
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            try:
+                keys[data["kid"]] = jwt.PyJWK(data).key
+            except jwt.PyJWKError as e:
+                logger.error(f"Skipping unusable JWKS key {data.get('kid')}: {e}")
+
+        if not keys:
+            raise JWKSError("The JWKS endpoint returned no usable signing keys")
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        self.fetches += 1
+
+    async def refresh(self):
+        """Fetch the key set, sharing the outcome of a fetch already in progress."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        attempted_at = self._attempted_at
+        async with self._lock:
+            # Another caller tried while this one waited; don't queue a second fetch
+            if self._attempted_at != attempted_at:
+                if self._last_error is not None:
+                    raise self._last_error
+                return
+
+            try:
+                await self._fetch()
+                self._last_error = None
+            except Exception as e:
+                self._last_error = e
+                raise
+            finally:
+                self._attempted_at = time.monotonic()
+
+    def start(self):
+        """Begin background refreshes; safe to call more than once."""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the keys we have; the TTL decides when they go stale
+                logger.error(f"Error refreshing JWKS: {e}")
+
+    async def get_signing_key(self, kid: str) -> Any:
+        """
+        Return the signing key for ``kid``.
+
+        Raises:
+            JWKSError: If the key set cannot be fetched or has no such key
+        """
+        self.start()
+
+        key = self._keys.get(kid)
+        if key is not None and self._fresh():
+            return key
+
+        # Neither unknown kids nor a JWKS outage may turn into a fetch per request
+        recently = (
+            self._attempted_at is not None
+            and time.monotonic() - self._attempted_at < self.min_refetch_interval
+        )
+        if key is not None and (recently or self._lock is not None and self._lock.locked()):
+            # A refresh just failed or is in flight; the stale key serves meanwhile
+            return key
+        if key is None and recently:
+            if self._last_error is not None:
+                raise JWKSError(f"Unable to fetch signing keys: {self._last_error}")
+            raise JWKSError(f"Unknown signing key: {kid}")
+
+        try:
+            await self.refresh()
+        except Exception as e:
+            if key is not None:
+                # A stale key beats failing every request while the provider is down
+                logger.error(f"Error refreshing JWKS, using cached keys: {e}")
+                return key
+            if isinstance(e, JWKSError):
+                raise
+            raise JWKSError(f"Unable to fetch signing keys: {e}") from e
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWKSError(f"Unknown signing key: {kid}")
+        return key
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        await self.client.aclose()
+
+
+class VerifiedTokenCache:
+    """
+    LRU of verified token payloads keyed by a hash of the token.
+
+    Entries are dropped at the token's exp, or after ``max_ttl`` seconds so
+    revoked signing keys stop being honoured reasonably quickly.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_ttl: float = 300.0, leeway: float = 0.0):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.leeway = leeway
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "VerifiedTokenCache":
+        """Build a cache from AUTH_TOKEN_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("AUTH_TOKEN_CACHE_ENTRIES", 10_000)),
+            max_ttl=float(os.getenv("AUTH_TOKEN_CACHE_SECONDS", 300)),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return the payload of a token verified earlier that has not expired."""
+        key = self.key(token)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expires_at, payload = entry
+            if time.time() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: dict):
+        """Remember a verified payload until its exp."""
+        exp = payload.get("exp")
+        if exp is None:
+            # Without an expiry there is nothing to bound the entry by
+            return
+
+        expires_at = min(float(exp) + self.leeway, time.time() + self.max_ttl)
+        key = self.key(token)
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import Field, BaseModel
 from beanie import Document
+from pymongo import IndexModel
 
 class ChatMessage(Document):
     user_id: str = Field(..., description="Clerk user ID", index=True)
@@ -17,3 +18,23 @@ class ChatMessage(Document):
             [("user_id", 1), ("resume_hash", 1), ("jd_hash", 1), ("created_at", 1)]
         ]
 
+
+class SessionMessage(BaseModel):
+    role: str = Field(..., description="Role of the sender ('user' or 'assistant')")
+    message: str = Field(..., description="Content of the chat message")
+
+
+class ChatSessionState(Document):
+    session_key: str = Field(..., description="user_id, resume_hash and jd_hash of the conversation")
+    messages: List[SessionMessage] = Field(default_factory=list, description="Rolling window of recent messages")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = Field(None, description="When the idle session is removed; pushed back on every write")
+
+    class Settings:
+        name = "chat_sessions"
+        indexes = [
+            IndexModel([("session_key", 1)], unique=True),
+            # Idle sessions expire on their own. The idle time is applied per
+            # document, so changing it never changes the index definition
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+        ]
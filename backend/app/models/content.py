@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import Field
+from beanie import Document
+from pymongo import IndexModel
+
+
+class TextBlob(Document):
+    """Text stored once per content hash, zlib-compressed above a size threshold."""
+
+    content_hash: str = Field(..., description="MD5 of the text, as used for resume_hash/jd_hash")
+    text: Optional[str] = Field(None, description="Plain text when stored uncompressed")
+    compressed: Optional[bytes] = Field(None, description="zlib-compressed UTF-8 text")
+    size: int = Field(..., description="Uncompressed text size in bytes")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ResumeText(TextBlob):
+    class Settings:
+        name = "resume_texts"
+        indexes = [
+            IndexModel([("content_hash", 1)], unique=True),
+        ]
+
+
+class JobDescriptionText(TextBlob):
+    class Settings:
+        name = "job_descriptions"
+        indexes = [
+            IndexModel([("content_hash", 1)], unique=True),
+        ]
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pydantic import Field
+from beanie import Document
+
+
+class ExtractedText(Document):
+    file_hash: str = Field(..., description="SHA-256 of the extraction version and raw PDF bytes", index=True, unique=True)
+    resume_hash: str = Field(..., description="Hash of the extracted text; the text lives in resume_texts")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    class Settings:
+        name = "extracted_texts"
@@ -1,7 +1,19 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List, Dict, Any
 from pydantic import Field, BaseModel
-from beanie import Document
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
+
+# Characters of the job description returned by snippet projections
+JD_SNIPPET_CHARS = 200
+
+
+class IndexStatus(str, Enum):
+    PENDING = "pending"
+    INDEXING = "indexing"
+    INDEXED = "indexed"
+    FAILED = "failed"
 
 
 class ResumeAnalysis(Document):
@@ -14,22 +26,109 @@ class ResumeAnalysis(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     ats_score: Optional[float] = None
     weights: Optional[Dict[str, float]] = None  # Weights for ATS score calculation
-    resume_text: Optional[str] = Field(..., description="Extracted text from the resume")
-    job_description: str = Field(..., description="Job description text")
+    # Texts live in resume_texts / job_descriptions keyed by hash; older records hold them inline
+    resume_text: Optional[str] = Field(None, description="Extracted text from the resume (legacy records only)")
+    job_description: Optional[str] = Field(None, description="Job description text (legacy records only)")
+    jd_snippet: Optional[str] = Field(None, description="First JD_SNIPPET_CHARS characters of the job description, for history lists")
+    prompt_version: Optional[str] = Field(None, description="Version of the prompts that produced the analysis")
+    index_status: Optional[IndexStatus] = Field(None, description="Vector store indexing state; None for records indexed inline")
+    index_owner: Optional[str] = Field(None, description="Indexing worker that claimed the job")
+    index_claimed_at: Optional[datetime] = Field(None, description="When the job was last claimed")
+    index_attempts: int = Field(0, description="Indexing attempts started so far")
+    index_retry_at: Optional[datetime] = Field(None, description="Earliest retry of a failed job; None when not retried")
 
     class Settings:
         name = "analyses"
         indexes = [
-            [("user_id", 1), ("resume_hash", 1), ("jd_hash", 1)]  # Compound index for efficient lookups
+            # One analysis per user and resume/JD pair; also serves the per-user lookups
+            IndexModel(
+                [("user_id", 1), ("resume_hash", 1), ("jd_hash", 1)],
+                unique=True,
+            ),
+            [("resume_hash", 1), ("jd_hash", 1), ("prompt_version", 1)],  # Cross-user analysis reuse
+            [("index_status", 1), ("created_at", 1)],  # Recovering unfinished indexing jobs
+            [("user_id", 1), ("created_at", -1), ("_id", -1)],  # Keyset pagination of a user's history
         ]
 
 
 class QueryResumeAnalysis(BaseModel):
+    id: Optional[PydanticObjectId] = Field(None, alias="_id")
     resume_hash: str
     jd_hash: str
     resume_filename: str
-    job_description: str
+    job_description: Optional[str] = None
     file_path: Optional[str] = None
     created_at: datetime 
     ats_score: Optional[float]
 
+
+class QueryResumeAnalysisSnippet(QueryResumeAnalysis):
+    """History row with only the start of the job description."""
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "resume_hash": 1,
+            "jd_hash": 1,
+            "resume_filename": 1,
+            # Legacy records only hold the full text inline; cut it server-side
+            "job_description": {
+                "$ifNull": ["$jd_snippet", {"$substrCP": ["$job_description", 0, JD_SNIPPET_CHARS]}]
+            },
+            "file_path": 1,
+            "created_at": 1,
+            "ats_score": 1,
+        }
+
+
+class QueryResumeAnalysisNoJD(BaseModel):
+    """History row without the job description."""
+
+    id: Optional[PydanticObjectId] = Field(None, alias="_id")
+    resume_hash: str
+    jd_hash: str
+    resume_filename: str
+    file_path: Optional[str] = None
+    created_at: datetime
+    ats_score: Optional[float]
+
+
+class AnalysisCounter(Document):
+    """Number of analyses a user has, kept in step with inserts and deletes."""
+
+    user_id: str = Field(..., description="Clerk user ID")
+    count: int = 0
+
+    class Settings:
+        name = "analysis_counters"
+        indexes = [
+            IndexModel([("user_id", 1)], unique=True),
+        ]
+
+
+class AnalysisExists(BaseModel):
+    id: Optional[PydanticObjectId] = Field(None, alias="_id")
+
+
+class AnalysisTexts(BaseModel):
+    """Inline texts of an analysis; None on records that keep them in the text store."""
+
+    resume_text: Optional[str] = None
+    job_description: Optional[str] = None
+
+
+class AnalysisDetails(BaseModel):
+    analysis_result: Dict[str, Any]
+    job_description: Optional[str] = None
+    file_path: Optional[str] = None
+    resume_filename: str
+    weights: Optional[Dict[str, float]] = None
+    ats_score: Optional[float] = None
+
+
+class CachedAnalysisResult(BaseModel):
+    analysis_result: Dict[str, Any]
+
+
+class IndexStatusView(BaseModel):
+    index_status: Optional[IndexStatus] = None
@@ -0,0 +1,88 @@
+"""
+In-memory PDF text extraction running in a process pool.
+
+Parsing happens in worker processes straight from the uploaded bytes, so large
+or image-heavy PDFs never block the event loop and never touch the disk.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import List, Optional
+
+from pypdf import PdfReader
+
+# Matches the page delimiter PyPDFLoader used in "single" mode, so resume
+# text (and therefore resume_hash) stays identical to earlier extractions.
+PAGES_DELIMITER = "\n\f"
+
+# Bumped whenever extracted text can change for the same file, so cached
+# extractions from an older version are not reused
+EXTRACTION_VERSION = "2"
+
+
+class PDFLimitError(ValueError):
+    """Raised when a PDF exceeds the configured size or page limits."""
+
+
+def _read_pages(data: bytes, max_pages: int) -> List[str]:
+    """
+    Extract the text of every page of a PDF held in memory.
+
+    Runs inside a worker process, so it must stay a picklable module-level function.
+    """
+    reader = PdfReader(BytesIO(data))
+    total = len(reader.pages)
+
+    if total > max_pages:
+        raise PDFLimitError(f"PDF has {total} pages; the limit is {max_pages}.")
+
+    # PyPDFLoader stripped each page before joining them
+    return [page.extract_text().strip() for page in reader.pages]
+
+
+class PDFExtractor:
+    """Extract text from PDF bytes in a process pool, with size and page limits."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_pages: int = 20,
+    ):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        # "spawn" avoids forking a process that already holds model threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @classmethod
+    def from_env(cls) -> "PDFExtractor":
+        """Build an extractor from PDF_* environment variables."""
+        workers = os.getenv("PDF_WORKERS")
+        return cls(
+            max_workers=int(workers) if workers else None,
+            max_bytes=int(os.getenv("PDF_MAX_BYTES", 10 * 1024 * 1024)),
+            max_pages=int(os.getenv("PDF_MAX_PAGES", 20)),
+        )
+
+    def _check_size(self, data: bytes):
+        if len(data) > self.max_bytes:
+            raise PDFLimitError(
+                f"PDF is {len(data)} bytes; the limit is {self.max_bytes} bytes."
+            )
+
+    async def extract(self, data: bytes) -> str:
+        """Extract the full text of a PDF as a single string."""
+        self._check_size(data)
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(
+            self._pool, _read_pages, data, self.max_pages
+        )
+        return PAGES_DELIMITER.join(pages)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
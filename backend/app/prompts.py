@@ -0,0 +1,31 @@
+"""
+Prompt construction for resume analysis.
+"""
+import hashlib
+from typing import List, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+
+class AnalysisPrompt:
+    """
+    Builds the message list for a single analysis request.
+
+    The system prompt is built once and kept as an immutable prefix; every call
+    to ``build`` returns a fresh list so no request state leaks into the next.
+    """
+
+    def __init__(self, system_prompt: str, prompt_template: str):
+        self.prefix: Tuple[BaseMessage, ...] = (SystemMessage(system_prompt.strip()),)
+        self.template = prompt_template
+        # Changes whenever either prompt changes, so cached results can be keyed on it
+        self.version = hashlib.sha256(
+            (system_prompt + "\0" + prompt_template).encode()
+        ).hexdigest()[:16]
+
+    def format(self, resume_text: str, job_description: str) -> str:
+        """Fill the user prompt template with the resume and job description."""
+        return (self.template % (resume_text, job_description)).strip()
+
+    def build(self, resume_text: str, job_description: str) -> List[BaseMessage]:
+        """Return the messages to send to the model for one analysis."""
+        return [*self.prefix, HumanMessage(self.format(resume_text, job_description))]
@@ -1,11 +1,18 @@
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains import create_history_aware_retriever
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
 from langchain_core.prompts import MessagesPlaceholder
 from langchain.schema import BaseRetriever
 from langchain.schema import Document
-from typing import List, Any
+from typing import List, Any, Dict, Tuple
 from pydantic import Field
 
 system_prompt = """
@@ -57,64 +64,172 @@ contextualize_q_prompt = ChatPromptTemplate.from_messages(
 )
 
 
+# Words that usually point back into the conversation ("what about that?",
+# "tell me more"), meaning the question cannot be searched on its own
+_REFERENCE_PATTERN = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|their|he|she|his|her|"
+    r"above|previous|earlier|more|else|same|also|why|elaborate|expand)\b",
+    re.IGNORECASE,
+)
+
+
+def needs_rewrite(question: str, chat_history: list) -> bool:
+    """
+    Cheap check for whether a question needs the history-aware rewrite.
+
+    Questions with no prior turns, or that read as self-contained (no
+    back-references and long enough to carry their own subject), are searched as-is.
+    """
+    if not chat_history:
+        return False
+    if len(question.split()) <= 3:
+        return True
+    return bool(_REFERENCE_PATTERN.search(question))
+
+
+class QueryRewriter:
+    """
+    Turns follow-up questions into standalone search queries.
+
+    Only calls the LLM when ``needs_rewrite`` says so (in "auto" mode), and
+    remembers rewrites for this conversation.
+    """
+
+    def __init__(self, llm, mode: str = "auto", max_entries: int = 64):
+        self.chain = contextualize_q_prompt | llm | StrOutputParser()
+        self.mode = mode
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = OrderedDict()
+        self.skipped = 0
+        self.cached = 0
+        self.rewritten = 0
+
+    def _plan(self, inputs: Dict[str, Any]):
+        question = inputs["input"]
+        history = inputs.get("chat_history") or []
+
+        if self.mode == "never" or (self.mode == "auto" and not needs_rewrite(question, history)):
+            self.skipped += 1
+            return question, None
+
+        # The same question can mean different things after different turns
+        key = (question, tuple(str(m.content) for m in history[-4:]))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cached += 1
+            return self._cache[key], None
+        return None, key
+
+    def _remember(self, key, rewritten: str) -> str:
+        self.rewritten += 1
+        self._cache[key] = rewritten
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return rewritten
+
+    def rewrite(self, inputs: Dict[str, Any]) -> str:
+        query, key = self._plan(inputs)
+        if query is not None:
+            return query
+        return self._remember(key, self.chain.invoke(inputs))
+
+    async def arewrite(self, inputs: Dict[str, Any]) -> str:
+        query, key = self._plan(inputs)
+        if query is not None:
+            return query
+        return self._remember(key, await self.chain.ainvoke(inputs))
+
+
+def create_rewriting_retriever(llm, retriever, mode: str = "auto"):
+    """
+    Drop-in replacement for create_history_aware_retriever that skips the
+    rewrite LLM call when the question can be searched as-is.
+    """
+    rewriter = QueryRewriter(llm, mode=mode)
+
+    def retrieve(inputs):
+        return retriever.invoke(rewriter.rewrite(inputs))
+
+    async def aretrieve(inputs):
+        return await retriever.ainvoke(await rewriter.arewrite(inputs))
+
+    return RunnableLambda(retrieve, afunc=aretrieve).with_config(
+        run_name="chat_retriever_chain"
+    )
+
+
+# Runs the second filtered search while the calling thread runs the first
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
+
 class CombinedRetriever(BaseRetriever):
-    """Custom retriever that combines job description and resume retrievers."""
+    """
+    Custom retriever that combines job description and resume results.
 
-    jd_retriever: Any = Field(description="Job description retriever")
-    resume_retriever: Any = Field(description="Resume retriever")
+    The question is embedded once and both filtered searches run concurrently
+    against that vector.
+    """
 
-    def __init__(self, jd_retriever, resume_retriever, **kwargs):
-         super().__init__(
-            jd_retriever=jd_retriever, resume_retriever=resume_retriever, **kwargs # type: ignore
-        )
+    vector_store: Any = Field(description="Vector store holding both document types")
+    jd_where: Dict[str, Any] = Field(description="Metadata filter for job description chunks")
+    resume_where: Dict[str, Any] = Field(description="Metadata filter for resume chunks")
+    jd_k: int = Field(default=3, description="Job description chunks to return")
+    resume_k: int = Field(default=5, description="Resume chunks to return")
 
-    def _get_relevant_documents(self, query: str) -> List[Document]:
+    def _search(self, embedding: List[float], where: Dict[str, Any], k: int) -> List[Document]:
+        return self.vector_store.similarity_search_by_vector(embedding, k=k, filter=where)
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
         """Retrieve relevant documents from both JD and resume sources."""
-        jd_docs = self.jd_retriever.invoke(query)
-        resume_docs = self.resume_retriever.invoke(query)
-        
-        return jd_docs + resume_docs
+        embedding = self.vector_store.embeddings.embed_query(query)
 
-    async def _aget_relevant_documents(self, query: str) -> List[Document]:
+        jd_docs = _search_pool.submit(self._search, embedding, self.jd_where, self.jd_k)
+        resume_docs = self._search(embedding, self.resume_where, self.resume_k)
+        return jd_docs.result() + resume_docs
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
         """Async version of get_relevant_documents."""
-        jd_docs = await self.jd_retriever.ainvoke(query)
-        resume_docs = await self.resume_retriever.ainvoke(query)
-        return jd_docs + resume_docs
+        embedding = await self.vector_store.embeddings.aembed_query(query)
 
+        jd_docs, resume_docs = await asyncio.gather(
+            asyncio.to_thread(self._search, embedding, self.jd_where, self.jd_k),
+            asyncio.to_thread(self._search, embedding, self.resume_where, self.resume_k),
+        )
+        return jd_docs + resume_docs
 
 
 def get_rag_chain(llm, vector_store, user_id, resume_hash, jd_hash):
     
-    jd_retriever = vector_store.as_retriever(
-        search_kwargs={
-            "k": 3, 
-            "where": {
-                "$and": [
-                    {"user_id": {"$eq": user_id}}, 
-                    {"content_hash": {"$eq": jd_hash}}
-                ]
-            }
-        }
-    )
-
-    resume_retriever = vector_store.as_retriever(
-        search_kwargs={
-            "k": 5,
-            "where": {
-                "$and": [
-                    {"user_id": {"$eq": user_id}}, 
-                    {"content_hash": {"$eq": resume_hash}}
-                ]
-            }
+    # Combine both filtered searches over a single query embedding
+    retriever = CombinedRetriever(
+        vector_store=vector_store,
+        jd_where={
+            "$and": [
+                {"user_id": {"$eq": user_id}}, 
+                {"content_hash": {"$eq": jd_hash}}
+            ]
         },
+        resume_where={
+            "$and": [
+                {"user_id": {"$eq": user_id}}, 
+                {"content_hash": {"$eq": resume_hash}}
+            ]
+        },
+        jd_k=3,
+        resume_k=5,
     )
 
-    # Combine both retrievers
-    retriever = CombinedRetriever(jd_retriever, resume_retriever)
-
-    history_aware_retriever = create_history_aware_retriever(
-        llm, retriever, contextualize_q_prompt
-    )
+    # CHAT_QUERY_REWRITE: "auto" skips the rewrite call for self-contained
+    # questions, "always" matches create_history_aware_retriever, "never" disables it
+    rewrite_mode = os.getenv("CHAT_QUERY_REWRITE", "auto")
+    if rewrite_mode == "always":
+        history_aware_retriever = create_history_aware_retriever(
+            llm, retriever, contextualize_q_prompt
+        )
+    else:
+        history_aware_retriever = create_rewriting_retriever(
+            llm, retriever, mode=rewrite_mode
+        )
 
     question_answer_chain = create_stuff_documents_chain(llm, prompt)
     rag_chain = create_retrieval_chain(history_aware_retriever, question_answer_chain)
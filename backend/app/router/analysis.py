@@ -1,14 +1,27 @@
 import hashlib
 from fastapi import  Form, Request, HTTPException ,APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
-from langchain_core.messages import SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
-from ..shared_resources import get_app_resources
+from ..shared_resources import (
+    get_analysis_cache,
+    get_analysis_jobs,
+    get_downloader,
+    get_extraction_cache,
+    get_indexer,
+    get_llm_executor,
+    get_pdf_extractor,
+)
 from ..vector_store import get_vector_store
 from ..utils import *
-from ..models.resume import ResumeAnalysis
+from ..models.resume import JD_SNIPPET_CHARS, ResumeAnalysis, IndexStatus, AnalysisDetails
+from ..prompts import AnalysisPrompt
+from ..single_flight import SingleFlight
+from ..text_store import get_job_descriptions, put_texts
+from ..analysis_jobs import AnalysisJob
+from typing import Callable, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
 
 load_dotenv()
 
@@ -21,15 +34,146 @@ with open(os.path.join(curr_dir, "prompt.txt"), "r") as f:
 with open(os.path.join(curr_dir, "system_prompt.txt"), "r") as f:
     system_prompt = f.read()
 
-messages = [
-    SystemMessage(system_prompt.strip()),
-]
+analysis_prompt = AnalysisPrompt(system_prompt, prompt)
 
 router = APIRouter(
     prefix="/analysis",
 )
 
 
+# Analyses currently running in this process, keyed per user and submission
+in_flight = SingleFlight()
+
+
+async def run_analysis(
+    request: Request,
+    user_id: str,
+    job_description: str,
+    file_url: str,
+    file_name: str,
+    jd_hash: str,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Download, extract, analyze, store and index one resume submission.
+
+    ``progress(stage, data)`` is called as the downloaded, extracted and
+    analyzed stages complete; indexing continues in the background.
+    """
+    report = progress or (lambda stage, data: None)
+    indexer = get_indexer(request)
+    executor = get_llm_executor(request)
+    extractor = get_pdf_extractor(request)
+    extraction_cache = get_extraction_cache(request)
+    downloader = get_downloader(request)
+    analysis_cache = get_analysis_cache(request)
+
+    # Create model for compatibility
+    model = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
+
+    actual_resume = await download_file_from_url(file_url, downloader)
+    report("downloaded", {})
+
+    # Extract text from the PDF, skipping the parse for files seen before
+    resume_text, resume_hash = await extract_resume_text(
+        actual_resume, extractor, extraction_cache
+    )
+
+    if not resume_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from PDF. Please ensure the PDF contains readable text.",
+        )
+    report("extracted", {"resume_hash": resume_hash})
+
+    # Check if analysis already exists
+    if await analysis_exists(user_id, resume_hash, jd_hash):
+        # Return cached analysis
+        report("analyzed", {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": True})
+        return {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": True}
+
+    # Analyze resume with actual content, reusing identical analyses from any user
+    analysis, _ = await get_cached_analysis(
+        job_description,
+        resume_text,
+        resume_hash,
+        jd_hash,
+        analysis_prompt,
+        model,
+        executor,
+        analysis_cache,
+    )  # Save analysis to database
+
+    # Texts are stored once per hash, before the analysis that refers to them
+    await put_texts(resume_hash, resume_text, jd_hash, job_description)
+
+    analysis_record = ResumeAnalysis(
+        user_id=user_id,
+        resume_hash=resume_hash,
+        jd_hash=jd_hash,
+        analysis_result=analysis,
+        resume_filename=file_name,  # Use the original filename or default to "resume.pdf"
+        file_path=file_url,  # Store the UploadThing file URL
+        jd_snippet=job_description[:JD_SNIPPET_CHARS],
+        prompt_version=analysis_prompt.version,
+        index_status=IndexStatus.PENDING,
+    )
+
+    try:
+        await analysis_record.insert()
+    except DuplicateKeyError:
+        # Another worker stored the same analysis first
+        report("analyzed", {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": True})
+        return {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": True}
+
+    report("analyzed", {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": False})
+    await increment_analysis_count(user_id)
+
+    # Embed into the vector store in the background; chat waits for it when needed
+    indexer.enqueue(analysis_record, actual_resume.filename, resume_text, job_description)
+
+    return {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": False}
+
+
+def validate_submission(
+    request: Request, job_description: str, file_url: str, file_name: str
+) -> Tuple[str, str]:
+    """
+    Check an analysis submission.
+
+    Returns:
+        tuple: (user_id, jd_hash)
+
+    Raises:
+        HTTPException: If the user is not authenticated or a field is missing
+    """
+    user_id = request.state._state.get("user_id")
+
+    if not user_id:
+        raise HTTPException(
+            status_code=401, detail="Unauthorized: User not authenticated"
+        )
+
+    # Validate that we have either a file or file_url
+    if not file_url:
+        raise HTTPException(status_code=400, detail="file_url must be provided.")
+
+    # Validate job description
+    if not job_description.strip():
+        raise HTTPException(
+            status_code=400, detail="Job description cannot be empty."
+        )
+    if not file_name:
+        raise HTTPException(
+            status_code=400, detail="File name must be provided."
+        )
+
+    # Generate hashes
+    jd_hash = hashlib.md5(job_description.encode()).hexdigest()
+
+    return user_id, jd_hash
+
+
 @router.post("/analyze-resume")
 async def analyze_resume(
     request: Request,
@@ -37,92 +181,135 @@ async def analyze_resume(
     file_url: str = Form(...),
     file_name: str = Form(...),
 ):
-    try:        # Get LLM and vector store from app state
-        _, vector_store = get_app_resources(request)
-        
-        # Create model for compatibility
-        model = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
-        
-        user_id = request.state._state.get("user_id")
+    try:
+        user_id, jd_hash = validate_submission(
+            request, job_description, file_url, file_name
+        )
 
-        if not user_id:
-            raise HTTPException(
-                status_code=401, detail="Unauthorized: User not authenticated"
-            )
+        # Double-clicks and client retries wait for the submission already running
+        result, shared = await in_flight.do(
+            (user_id, file_url, jd_hash),
+            lambda: run_analysis(
+                request, user_id, job_description, file_url, file_name, jd_hash
+            ),
+        )
 
-        # Validate that we have either a file or file_url
-        if not file_url:
-            raise HTTPException(status_code=400, detail="file_url must be provided.")
+        if shared:
+            return {**result, "cached": True}
+        return result
 
-        # Validate job description
-        if not job_description.strip():
-            raise HTTPException(
-                status_code=400, detail="Job description cannot be empty."
+    except HTTPException as e:
+        print(e)
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": str(e.detail), "success": False},
+            headers=e.headers,
+        )
+    except Exception as e:
+        print(e)
+        return JSONResponse(
+            status_code=500, content={"error": str(e), "success": False}
+        )
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    request: Request,
+    job_description: str = Form(...),
+    file_url: str = Form(...),
+    file_name: str = Form(...),
+):
+    """
+    Start an analysis in the background and return its job id.
+
+    Follow progress with GET /analysis/jobs/{job_id}/events (SSE) or poll
+    GET /analysis/jobs/{job_id}.
+    """
+    try:
+        user_id, jd_hash = validate_submission(
+            request, job_description, file_url, file_name
+        )
+        analysis_jobs = get_analysis_jobs(request)
+        indexer = get_indexer(request)
+
+        async def run_job(job: AnalysisJob) -> dict:
+            # Shares the computation with /analyze-resume for the same submission
+            result, shared = await in_flight.do(
+                (user_id, file_url, jd_hash),
+                lambda: run_analysis(
+                    request,
+                    user_id,
+                    job_description,
+                    file_url,
+                    file_name,
+                    jd_hash,
+                    progress=job.progress,
+                ),
             )
-        if not file_name:
-            raise HTTPException(
-                status_code=400, detail="File name must be provided."
+            if shared:
+                # The earlier stages were reported to the caller that started it
+                result = {**result, "cached": True}
+                job.progress("analyzed", result)
+            indexed = await indexer.wait_until_indexed(
+                user_id, result["resume_hash"], jd_hash
             )
+            job.progress("indexed", {"indexed": indexed})
+            return result
 
-        actual_resume = await download_file_from_url(file_url)
+        # Resubmitting while a job for the same submission runs returns that job
+        job = analysis_jobs.submit((user_id, file_url, jd_hash), user_id, run_job)
 
-        # Extract text from the PDF
-        resume_text = await extract_text_from_pdf(actual_resume)
+        return {"job_id": job.id, "status": job.status}
 
-        if not resume_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from PDF. Please ensure the PDF contains readable text.",
-            )
-
-        # Generate hashes
-        resume_hash = hashlib.md5(resume_text.encode()).hexdigest()
-        jd_hash = hashlib.md5(
-            job_description.encode()
-        ).hexdigest()  # Check if analysis already exists
-
-        existing_analysis = await get_analysis_by_hashes(user_id, resume_hash, jd_hash)
-
-        if existing_analysis:
-            # Return cached analysis
-            return {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": True}
-
-        # Analyze resume with actual content
-        analysis = get_analysis(
-            job_description, resume_text, messages, prompt, model
-        )  # Save analysis to database
-        
-        analysis_record = ResumeAnalysis(
-            user_id=user_id,
-            resume_hash=resume_hash,
-            jd_hash=jd_hash,
-            analysis_result=analysis,
-            resume_filename=file_name,  # Use the original filename or default to "resume.pdf"
-            job_description=job_description,
-            file_path=file_url,  # Store the UploadThing file URL
-            resume_text=resume_text,
+    except HTTPException as e:
+        print(e)
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": str(e.detail), "success": False},
+            headers=e.headers,
         )
 
-        await analysis_record.insert()
 
-        # Add to vector store (keeping existing functionality)
-        add_to_vector_store(
-            user_id,
-            actual_resume.filename,
-            vector_store,
-            resume_text,
-            job_description,
-            resume_hash,
-            jd_hash,
+def get_user_job(request: Request, job_id: str) -> AnalysisJob:
+    user_id = request.state._state.get("user_id")
+
+    if not user_id:
+        raise HTTPException(
+            status_code=401, detail="Unauthorized: User not authenticated"
         )
 
-        return {"resume_hash": resume_hash, "jd_hash": jd_hash, "cached": False}
+    job = get_analysis_jobs(request).get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(request: Request, job_id: str):
+    return get_user_job(request, job_id).snapshot()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(request: Request, job_id: str):
+    """
+    Stream a job's stages as server-sent events.
+
+    Events: downloaded, extracted, analyzed (with the hashes), indexed, then
+    done with the result or error with the status code and message. Events
+    already emitted are replayed first, so reconnecting is safe.
+    """
+    job = get_user_job(request, job_id)
+
+    async def events():
+        async for item in job.follow():
+            yield f"event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    except Exception as e:
-        print(e)
-        return JSONResponse(
-            status_code=500, content={"error": str(e), "success": False}
-        )
 
 @router.post("/set-score")
 async def set_score_and_weights(request: Request):
@@ -147,17 +334,14 @@ async def set_score_and_weights(request: Request):
                 status_code=401, detail="Unauthorized: User not authenticated"
             )
 
-        analysis = await get_analysis_by_hashes(user_id, resume_hash, jd_hash)
-
-        if not analysis:
+        # Single $set on the matching analysis; no read or full-document save
+        if not await update_analysis_score(user_id, resume_hash, jd_hash, score, weights):
             raise HTTPException(status_code=404, detail="Analysis not found")
 
-        analysis.ats_score = score
-        analysis.weights = weights
-        await analysis.save()
-
         return {"message": "Score updated successfully"}
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -183,19 +367,25 @@ async def get_user_analysis(request: Request):
                 detail="Both 'resume_hash' and 'jd_hash' must be provided",
             )
 
-        analysis = await get_analysis_by_hashes(user_id, resume_hash, jd_hash)
+        analysis = await get_analysis_fields(user_id, resume_hash, jd_hash, AnalysisDetails)
 
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
 
+        job_description = analysis.job_description
+        if job_description is None:
+            job_description = (await get_job_descriptions([jd_hash])).get(jd_hash)
+
         return {
             "analysis": analysis.analysis_result,
-            "job_description": analysis.job_description,
+            "job_description": job_description,
             "file_path": analysis.file_path,
             "file_name": analysis.resume_filename,
             "weights": analysis.weights,
             "ats_score": analysis.ats_score,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,8 +1,15 @@
+import json
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from ..models.chat import ChatMessage
 from ..rag import get_rag_chain,prompt
-from ..utils import get_chat_history_for_rag, get_chat_history_for_user,get_analysis_by_hashes
-from ..shared_resources import get_app_resources
+from ..utils import get_chat_history_for_rag, get_chat_history_for_user,get_analysis_fields
+from ..models.resume import AnalysisTexts
+from ..shared_resources import get_indexer, get_llm, get_vector_store_loader
+from ..session_cache import SessionCache
+from ..session_state import get_session_state
+from ..text_store import get_texts
 
 from langchain_core.messages import AIMessage, HumanMessage
 
@@ -11,7 +18,12 @@ router = APIRouter(
     tags=["chat"],
 )
 
-user_chains = {}
+# Per-conversation RAG chains, bounded and LRU-evicted. Chains only hold
+# local objects, so each process keeps its own.
+user_chains = SessionCache.from_env()
+
+# Rolling chat history; shared across workers with CHAT_SESSION_BACKEND=mongo
+session_state = get_session_state()
 
 def should_use_vector(query: str) -> bool:
     # Naive logic: use vector for specific/narrow queries
@@ -37,115 +49,180 @@ async def get_chat_history(request: Request, resume_hash: str, jd_hash: str):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@router.post("/message")
-async def query(request: Request):
+async def prepare_turn(request: Request) -> dict:
+    """
+    Validate a chat request and pick how to answer it.
 
-    try:        # Get LLM and vector store from app state
-        llm, vector_store = get_app_resources(request)
-        
-        data = await request.json()
+    Returns the runnable to call (RAG chain or full-context prompt) with its
+    inputs, plus the keys needed to persist the turn afterwards.
+    """
+    # Get LLM from app state; the vector store may still be warming up
+    llm = get_llm(request)
+    vector_store_loader = get_vector_store_loader(request)
+    
+    data = await request.json()
 
-        if "message" not in data:
-            raise HTTPException(
-                status_code=400, detail="Query must include 'message' field"
-            )
+    if "message" not in data:
+        raise HTTPException(
+            status_code=400, detail="Query must include 'message' field"
+        )
 
-        if "resume_hash" not in data:
-            raise HTTPException(
-                status_code=400, detail="Query must include 'resume_hash' field"
-            )
+    if "resume_hash" not in data:
+        raise HTTPException(
+            status_code=400, detail="Query must include 'resume_hash' field"
+        )
 
-        if "jd_hash" not in data:
-            raise HTTPException(
-                status_code=400, detail="Query must include 'jd_hash' field"
-            )
+    if "jd_hash" not in data:
+        raise HTTPException(
+            status_code=400, detail="Query must include 'jd_hash' field"
+        )
 
-        resume_hash = data["resume_hash"]
-        jd_hash = data["jd_hash"]
-        user_id = request.state._state.get("user_id")
+    resume_hash = data["resume_hash"]
+    jd_hash = data["jd_hash"]
+    user_id = request.state._state.get("user_id")
 
-        if not user_id:
-            raise HTTPException(
-                status_code=401, detail="Unauthorized: User not authenticated"
-            )
+    if not user_id:
+        raise HTTPException(
+            status_code=401, detail="Unauthorized: User not authenticated"
+        )
 
-        session_key = f"{user_id}_{resume_hash}_{jd_hash}"
+    session_key = f"{user_id}_{resume_hash}_{jd_hash}"
 
-        if session_key not in user_chains:
-            user_chains[session_key] = {
-                "chain": get_rag_chain(
-                    llm, vector_store, user_id, resume_hash, jd_hash
-                ),
-                "chat_history": await get_chat_history_for_rag(
-                    user_id, resume_hash, jd_hash
-                ),
-            }
+    chat_history = await session_state.get_history(session_key)
 
-            if len(user_chains) > 30:
-                user_chains.popitem()
+    if chat_history is None:
+        chat_history = await get_chat_history_for_rag(
+            user_id, resume_hash, jd_hash
+        )
+        await session_state.set_history(session_key, chat_history)
 
-        query = data["message"]
-        chat_history = user_chains[session_key]["chat_history"]
+    query = data["message"]
 
-        if should_use_vector(query):
-            # Use vector-based RAG chain 
-            chain = user_chains[session_key]["chain"]
+    # Only wait on background indexing when the question needs vectors;
+    # fall back to the full-context answer if they are not ready
+    use_vector = (
+        should_use_vector(query)
+        and vector_store_loader.ready
+        and await get_indexer(request).wait_until_indexed(
+            user_id, resume_hash, jd_hash
+        )
+    )
 
-            response = chain.invoke({
-                "input": query,
-                "chat_history": chat_history,
-            })
+    if use_vector:
+        # Use vector-based RAG chain 
+        session = user_chains.get(session_key)
+        if session is None:
+            session = {
+                "chain": get_rag_chain(
+                    llm, vector_store_loader.value, user_id, resume_hash, jd_hash
+                )
+            }
+            user_chains.put(session_key, session)
 
-            model_response = response["answer"]
+        runnable = session["chain"]
+        inputs = {
+            "input": query,
+            "chat_history": chat_history,
+        }
 
+    else:
+        doc = await get_analysis_fields(user_id, resume_hash, jd_hash, AnalysisTexts)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+
+        resume, jd = await get_texts(
+            resume_hash, jd_hash, doc.resume_text, doc.job_description
+        )
+
+        context = f"Your are an expert resume evaluator. Keep Your answers concise. Resume:\n{resume}\n\nJob Description:\n{jd}"
+
+        runnable = prompt | llm
+        inputs = {
+            "input": query,
+            "context": context,
+            "chat_history": chat_history,
+        }
+
+    return {
+        "user_id": user_id,
+        "resume_hash": resume_hash,
+        "jd_hash": jd_hash,
+        "session_key": session_key,
+        "message": query,
+        "use_vector": use_vector,
+        "runnable": runnable,
+        "inputs": inputs,
+    }
+
+
+async def save_turn(turn: dict, model_response: str):
+    """Persist both messages of a completed turn and extend the rolling history."""
+    currUserMsg = ChatMessage(
+        user_id=turn["user_id"],
+        resume_hash=turn["resume_hash"],
+        jd_hash=turn["jd_hash"],
+        message=turn["message"],
+        role="user",
+    )
+
+    currAssistantMsg = ChatMessage(
+        user_id=turn["user_id"],
+        resume_hash=turn["resume_hash"],
+        jd_hash=turn["jd_hash"],
+        message=model_response,
+        role="assistant",
+    )
+
+    await currUserMsg.insert()
+    await currAssistantMsg.insert()
+
+    await session_state.append(
+        turn["session_key"],
+        [
+            HumanMessage(content=turn["message"]),
+            AIMessage(content=model_response),
+        ],
+    )
+
+
+async def stream_answer(turn: dict) -> AsyncIterator[str]:
+    """Yield answer tokens as the model produces them."""
+    async for chunk in turn["runnable"].astream(turn["inputs"]):
+        if turn["use_vector"]:
+            # The retrieval chain streams dict updates; only "answer" carries tokens
+            token = chunk.get("answer")
         else:
-            doc = await get_analysis_by_hashes(user_id, resume_hash, jd_hash)
-            if not doc:
-                raise HTTPException(status_code=404, detail="Analysis not found")
+            token = chunk.content if hasattr(chunk, "content") else str(chunk)
 
-            resume = doc.resume_text
-            jd = doc.job_description
+        if token:
+            yield token
 
-            context = f"Your are an expert resume evaluator. Keep Your answers concise. Resume:\n{resume}\n\nJob Description:\n{jd}"
 
-            result = await (prompt | llm).ainvoke({
-                "input": query,
-                "context": context,
-                "chat_history": chat_history,
-            })
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
 
-            model_response = result.content if hasattr(result, "content") else str(result)
 
-        currUserMsg = ChatMessage(
-            user_id=user_id,
-            resume_hash=resume_hash,
-            jd_hash=jd_hash,
-            message=data["message"],
-            role="user",
-        )
+@router.post("/message")
+async def query(request: Request):
 
-        currAssistantMsg = ChatMessage(
-            user_id=user_id,
-            resume_hash=resume_hash,
-            jd_hash=jd_hash,
-            message=model_response,
-            role="assistant",
-        )
+    try:
+        turn = await prepare_turn(request)
 
-        await currUserMsg.insert()
-        await currAssistantMsg.insert()
+        if turn["use_vector"]:
+            # Fully async: embedding and Chroma searches run in worker threads,
+            # LLM calls are awaited, so other requests keep being served
+            response = await turn["runnable"].ainvoke(turn["inputs"])
 
-        chat_history.extend(
-            [
-                HumanMessage(content=data["message"]),
-                AIMessage(content=model_response),
-            ]
-        )
+            model_response = response["answer"]
 
-        if len(chat_history) > 20:
-            chat_history.pop(0)
+        else:
+            result = await turn["runnable"].ainvoke(turn["inputs"])
+
+            model_response = result.content if hasattr(result, "content") else str(result)
 
-        user_chains[session_key]["chat_history"] = chat_history
+        await save_turn(turn, model_response)
 
         return {"response": model_response}
 
@@ -154,6 +231,47 @@ async def query(request: Request):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post("/message/stream")
+async def query_stream(request: Request):
+    """
+    Streaming variant of /message using server-sent events.
+
+    Emits {"token": ...} events as the answer is generated, then a "done"
+    event with the full response once the turn has been saved, or an
+    "error" event if generation fails.
+    """
+    try:
+        turn = await prepare_turn(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    async def events():
+        parts = []
+        try:
+            async for token in stream_answer(turn):
+                parts.append(token)
+                yield sse_event({"token": token})
+
+            model_response = "".join(parts)
+            # Persist only once the full answer exists
+            await save_turn(turn, model_response)
+
+            yield sse_event({"response": model_response}, event="done")
+
+        except Exception as e:
+            print(e)
+            yield sse_event({"error": str(e)}, event="error")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/clear")
 async def clear_chat(request:Request):
     try:
@@ -181,12 +299,15 @@ async def clear_chat(request:Request):
 
         session_key = f"{user_id}_{resume_hash}_{jd_hash}"
 
-        if session_key in user_chains:
-            del user_chains[session_key]
+        user_chains.invalidate(session_key)
+        await session_state.invalidate(session_key)
 
         # Optionally clear chat history from database
-        await ChatMessage.find_all(user_id=user_id, resume_hash=resume_hash, jd_hash=jd_hash).delete()
-        user_chains[session_key]["chat_history"] = []
+        await ChatMessage.find(
+            ChatMessage.user_id == user_id,
+            ChatMessage.resume_hash == resume_hash,
+            ChatMessage.jd_hash == jd_hash,
+        ).delete()
         
         return {"message": "Chat cleared successfully"}
     except Exception as e:
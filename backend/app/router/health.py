@@ -4,7 +4,7 @@ Health check endpoints for monitoring and status verification.
 import os
 import time
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any
 
@@ -36,7 +36,7 @@ startup_time = time.time()
 
 
 @router.get("/", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """
     Basic health check endpoint.
     Returns overall application health status.
@@ -46,7 +46,7 @@ async def health_check():
         uptime = time.time() - startup_time
         
         # Check basic service availability
-        services = await check_services()
+        services = await check_services(request)
         
         # Determine overall status
         overall_status = "healthy"
@@ -70,18 +70,19 @@ async def health_check():
 
 
 @router.get("/ready")
-async def readiness_check():
+async def readiness_check(request: Request):
     """
     Readiness check - indicates if the service is ready to handle requests.
-    Useful for Kubernetes readiness probes.
+    Useful for Kubernetes readiness probes. Reports not-ready while the
+    embedding model and vector store are still warming up.
     """
     try:
-        services = await check_services()
+        services = await check_services(request)
         
         # Check if critical services are available
-        critical_services = ["database", "ai_service"]
+        critical_services = ["database", "ai_service", "vector_store"]
         for service_name in critical_services:
-            if service_name in services and services[service_name]["status"] == "unhealthy":
+            if service_name in services and services[service_name]["status"] != "healthy":
                 raise HTTPException(
                     status_code=503,
                     detail=f"Critical service {service_name} is not ready"
@@ -116,7 +117,7 @@ async def liveness_check():
     }
 
 
-async def check_services() -> Dict[str, Dict[str, Any]]:
+async def check_services(request: Request) -> Dict[str, Dict[str, Any]]:
     """
     Check the health of various services.
     """
@@ -128,9 +129,44 @@ async def check_services() -> Dict[str, Dict[str, Any]]:
     # Check AI Service
     services["ai_service"] = await check_ai_service()
     
+    # Check embedding model and vector store warm-up
+    services["vector_store"] = check_vector_store(request)
+    
     return services
 
 
+def check_vector_store(request: Request) -> Dict[str, Any]:
+    """Report whether the embedding model and vector store have finished loading."""
+    loader = getattr(request.app.state, "vector_store_loader", None)
+    
+    if loader is None:
+        return {
+            "status": "unhealthy",
+            "response_time_ms": 0,
+            "details": "Vector store not initialized"
+        }
+    
+    if loader.status == "ready":
+        return {
+            "status": "healthy",
+            "response_time_ms": 0,
+            "details": f"Vector store loaded in {loader.load_seconds:.1f}s"
+        }
+    
+    if loader.status == "failed":
+        return {
+            "status": "unhealthy",
+            "response_time_ms": 0,
+            "details": f"Vector store failed to load: {loader.error}"
+        }
+    
+    return {
+        "status": "starting",
+        "response_time_ms": 0,
+        "details": "Vector store is warming up"
+    }
+
+
 async def check_database() -> Dict[str, Any]:
     """Check MongoDB connection health."""
     try:
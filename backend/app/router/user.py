@@ -1,6 +1,10 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Request
 
-from ..utils import get_user_analyses_from_db
+from ..utils import get_analysis_count, get_user_analyses_from_db
+
+# Largest page a client can request
+MAX_PAGE_SIZE = 100
 
 router = APIRouter(
     prefix="/user",
@@ -10,7 +14,46 @@ router = APIRouter(
 
 
 @router.get("/analyses")
-async def get_user_analyses(request: Request, limit: int = 10, offset: int = 0):
+async def get_user_analyses(
+    request: Request,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    jd: str = "full",
+):
+    """
+    Page through the user's analyses, newest first.
+
+    Pass ``next_cursor`` from the previous response as ``cursor`` to get the
+    next page. ``jd`` selects how much of the job description each row
+    carries: full, snippet or none.
+    """
+    try:
+        user_id = request.state._state.get("user_id")
+        if not user_id:
+            raise HTTPException(
+                status_code=401, detail="Unauthorized: User not authenticated"
+            )
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        try:
+            analyses, next_cursor = await get_user_analyses_from_db(
+                user_id, limit, offset, cursor, jd
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {"analyses": analyses, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.get("/analyses/count")
+async def get_user_analyses_count(request: Request):
     try:
         user_id = request.state._state.get("user_id")
         if not user_id:
@@ -18,8 +61,9 @@ async def get_user_analyses(request: Request, limit: int = 10, offset: int = 0):
                 status_code=401, detail="Unauthorized: User not authenticated"
             )
 
-        analyses = await get_user_analyses_from_db(user_id, limit, offset)
-        return {"analyses": analyses}
+        return {"count": await get_analysis_count(user_id)}
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,143 @@
+"""
+Bounded cache of per-conversation chat sessions.
+
+Holds the RAG chain and rolling chat history for each (user, resume, JD)
+conversation so repeat turns skip rebuilding the chain and re-reading history
+from Mongo. Entries are evicted least recently used first, expire after an
+idle TTL, and count against a capacity weighted by the history they hold.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Rough fixed cost of a cached session (chain objects, dict, key)
+SESSION_OVERHEAD_BYTES = 4096
+
+
+def session_weight(session: Dict[str, Any]) -> int:
+    """Approximate memory held by a session: fixed overhead plus history text."""
+    history = session.get("chat_history") or []
+    return SESSION_OVERHEAD_BYTES + sum(len(str(m.content)) for m in history)
+
+
+class SessionCache:
+    """LRU + idle-TTL cache of chat sessions with a weighted capacity."""
+
+    def __init__(
+        self,
+        max_weight: int = 16 * 1024 * 1024,
+        max_entries: int = 1000,
+        idle_ttl: float = 30 * 60,
+    ):
+        self.max_weight = max_weight
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._weights: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionCache":
+        """Build a cache from CHAT_SESSION_* environment variables."""
+        return cls(
+            max_weight=int(os.getenv("CHAT_SESSION_MAX_BYTES", 16 * 1024 * 1024)),
+            max_entries=int(os.getenv("CHAT_SESSION_MAX_ENTRIES", 1000)),
+            idle_ttl=float(os.getenv("CHAT_SESSION_IDLE_SECONDS", 30 * 60)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "weight_bytes": self._weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> Optional[Dict[str, Any]]:
+        session = self._entries.pop(key, None)
+        if session is not None:
+            self._weight -= self._weights.pop(key)
+            self._last_used.pop(key)
+        return session
+
+    def _expire(self, now: float):
+        # Entries are kept in last-used order, so idle ones sit at the front
+        while self._entries:
+            key = next(iter(self._entries))
+            if now - self._last_used[key] <= self.idle_ttl:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def _shrink(self, keep: Optional[str] = None):
+        while self._entries and (
+            self._weight > self.max_weight or len(self._entries) > self.max_entries
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                # Never evict the entry being written; it is the most recent one
+                if len(self._entries) == 1:
+                    break
+                self._entries.move_to_end(key)
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a live session and mark it most recently used, or None."""
+        now = time.monotonic()
+        self._expire(now)
+
+        session = self._entries.get(key)
+        if session is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._last_used[key] = now
+        self.hits += 1
+        return session
+
+    def put(self, key: str, session: Dict[str, Any]):
+        """Insert or replace a session as the most recently used entry."""
+        now = time.monotonic()
+        self._expire(now)
+        self._remove(key)
+
+        weight = session_weight(session)
+        self._entries[key] = session
+        self._weights[key] = weight
+        self._last_used[key] = now
+        self._weight += weight
+        self._shrink(keep=key)
+
+    def reweigh(self, key: str):
+        """Recompute a session's weight after its history changed."""
+        session = self._entries.get(key)
+        if session is None:
+            return
+
+        weight = session_weight(session)
+        self._weight += weight - self._weights[key]
+        self._weights[key] = weight
+        self._shrink(keep=key)
+
+    def invalidate(self, key: str):
+        self._remove(key)
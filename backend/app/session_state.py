@@ -0,0 +1,143 @@
+"""
+Pluggable storage for the rolling chat history of each conversation.
+
+The in-process backend keeps history in a local SessionCache and suits a
+single worker. The Mongo backend keeps the window in a shared collection so
+every worker and replica sees the same history, updated atomically.
+Select with CHAT_SESSION_BACKEND=memory|mongo.
+"""
+import abc
+import datetime
+import os
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pymongo.errors import DuplicateKeyError
+
+from .models.chat import ChatSessionState, SessionMessage
+from .session_cache import SessionCache
+
+# Messages kept in the rolling window sent to the model
+HISTORY_WINDOW = 20
+
+
+def _to_session_message(message: BaseMessage) -> SessionMessage:
+    role = "user" if isinstance(message, HumanMessage) else "assistant"
+    return SessionMessage(role=role, message=str(message.content))
+
+
+def _to_langchain(message: SessionMessage) -> BaseMessage:
+    if message.role == "user":
+        return HumanMessage(content=message.message)
+    return AIMessage(content=message.message)
+
+
+class SessionState(abc.ABC):
+    """Interface for chat history backends."""
+
+    @abc.abstractmethod
+    async def get_history(self, key: str) -> Optional[List[BaseMessage]]:
+        """Return the cached window for a conversation, or None if not cached."""
+
+    @abc.abstractmethod
+    async def set_history(self, key: str, history: List[BaseMessage]):
+        """Seed the window, e.g. after loading it from chat_messages."""
+
+    @abc.abstractmethod
+    async def append(self, key: str, messages: List[BaseMessage]):
+        """Add messages to the window, keeping only the latest HISTORY_WINDOW."""
+
+    @abc.abstractmethod
+    async def invalidate(self, key: str):
+        """Forget the conversation so the next turn reloads it."""
+
+
+class InProcessSessionState(SessionState):
+    """History held in this process's memory."""
+
+    def __init__(self, cache: SessionCache):
+        self.cache = cache
+
+    async def get_history(self, key: str) -> Optional[List[BaseMessage]]:
+        session = self.cache.get(key)
+        return None if session is None else list(session["chat_history"])
+
+    async def set_history(self, key: str, history: List[BaseMessage]):
+        self.cache.put(key, {"chat_history": list(history[-HISTORY_WINDOW:])})
+
+    async def append(self, key: str, messages: List[BaseMessage]):
+        session = self.cache.get(key)
+        if session is None:
+            return
+
+        history = session["chat_history"]
+        history.extend(messages)
+        del history[:-HISTORY_WINDOW]
+        self.cache.reweigh(key)
+
+    async def invalidate(self, key: str):
+        self.cache.invalidate(key)
+
+
+class MongoSessionState(SessionState):
+    """History shared by all workers through the chat_sessions collection."""
+
+    def __init__(self, idle_ttl: float = 30 * 60):
+        self.idle_ttl = idle_ttl
+
+    @classmethod
+    def from_env(cls) -> "MongoSessionState":
+        return cls(idle_ttl=float(os.getenv("CHAT_SESSION_IDLE_SECONDS", 30 * 60)))
+
+    def _touch(self) -> dict:
+        now = datetime.datetime.utcnow()
+        return {"updated_at": now, "expires_at": now + datetime.timedelta(seconds=self.idle_ttl)}
+
+    async def get_history(self, key: str) -> Optional[List[BaseMessage]]:
+        state = await ChatSessionState.find_one(ChatSessionState.session_key == key)
+        if state is None:
+            return None
+        return [_to_langchain(m) for m in state.messages]
+
+    async def set_history(self, key: str, history: List[BaseMessage]):
+        messages = [_to_session_message(m).model_dump() for m in history[-HISTORY_WINDOW:]]
+        touched = self._touch()
+        try:
+            await ChatSessionState.find_one(ChatSessionState.session_key == key).upsert(
+                {"$set": {"messages": messages, **touched}},
+                on_insert=ChatSessionState(
+                    session_key=key,
+                    messages=[SessionMessage(**m) for m in messages],
+                    **touched,
+                ),
+            )
+        except DuplicateKeyError:
+            # Another worker seeded the same conversation first
+            pass
+
+    async def append(self, key: str, messages: List[BaseMessage]):
+        # $push with $slice trims the window in the same atomic update
+        await ChatSessionState.find_one(ChatSessionState.session_key == key).update(
+            {
+                "$push": {
+                    "messages": {
+                        "$each": [_to_session_message(m).model_dump() for m in messages],
+                        "$slice": -HISTORY_WINDOW,
+                    }
+                },
+                "$set": self._touch(),
+            }
+        )
+
+    async def invalidate(self, key: str):
+        await ChatSessionState.find_one(ChatSessionState.session_key == key).delete()
+
+
+def get_session_state() -> SessionState:
+    """Build the backend selected by CHAT_SESSION_BACKEND."""
+    backend = os.getenv("CHAT_SESSION_BACKEND", "memory")
+    if backend == "mongo":
+        return MongoSessionState.from_env()
+    if backend == "memory":
+        return InProcessSessionState(SessionCache.from_env())
+    raise ValueError(f"Unknown chat session backend: {backend}")
@@ -15,18 +15,17 @@ def get_app_resources(request: Request):
         tuple: (llm, vector_store)
         
     Raises:
-        HTTPException: If resources are not initialized
+        HTTPException: If resources are not initialized or still warming up
     """
     llm = getattr(request.app.state, 'llm', None)
-    vector_store = getattr(request.app.state, 'vector_store', None)
     
-    if llm is None or vector_store is None:
+    if llm is None:
         raise HTTPException(
             status_code=500, 
             detail="Application resources (LLM or vector store) not initialized"
         )
     
-    return llm, vector_store
+    return llm, get_vector_store(request)
 
 
 def get_llm(request: Request):
@@ -53,6 +52,30 @@ def get_llm(request: Request):
     return llm
 
 
+def get_vector_store_loader(request: Request):
+    """
+    Get the background loader for the vector store from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        BackgroundResource wrapping the vector store
+        
+    Raises:
+        HTTPException: If the loader is not initialized
+    """
+    loader = getattr(request.app.state, 'vector_store_loader', None)
+    
+    if loader is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="Vector store not initialized"
+        )
+    
+    return loader
+
+
 def get_vector_store(request: Request):
     """
     Get vector store from app state.
@@ -64,14 +87,183 @@ def get_vector_store(request: Request):
         Vector store instance
         
     Raises:
-        HTTPException: If vector store is not initialized
+        HTTPException: 503 while the vector store is still warming up
+    """
+    loader = get_vector_store_loader(request)
+    
+    if not loader.ready:
+        raise HTTPException(
+            status_code=503, 
+            detail="Vector store is warming up",
+            headers={"Retry-After": "5"},
+        )
+    
+    return loader.value
+
+
+def get_llm_executor(request: Request):
+    """
+    Get the bounded LLM executor from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        LLMExecutor instance
+        
+    Raises:
+        HTTPException: If the executor is not initialized
     """
-    vector_store = getattr(request.app.state, 'vector_store', None)
+    executor = getattr(request.app.state, 'llm_executor', None)
     
-    if vector_store is None:
+    if executor is None:
         raise HTTPException(
             status_code=500, 
-            detail="Vector store not initialized"
+            detail="LLM executor not initialized"
+        )
+    
+    return executor
+
+
+def get_pdf_extractor(request: Request):
+    """
+    Get the PDF extractor from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        PDFExtractor instance
+        
+    Raises:
+        HTTPException: If the extractor is not initialized
+    """
+    extractor = getattr(request.app.state, 'pdf_extractor', None)
+    
+    if extractor is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="PDF extractor not initialized"
+        )
+    
+    return extractor
+
+
+def get_extraction_cache(request: Request):
+    """
+    Get the PDF extraction cache from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        ExtractionCache instance
+        
+    Raises:
+        HTTPException: If the cache is not initialized
+    """
+    cache = getattr(request.app.state, 'extraction_cache', None)
+    
+    if cache is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="Extraction cache not initialized"
+        )
+    
+    return cache
+
+
+def get_downloader(request: Request):
+    """
+    Get the pooled file downloader from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        FileDownloader instance
+        
+    Raises:
+        HTTPException: If the downloader is not initialized
+    """
+    downloader = getattr(request.app.state, 'downloader', None)
+    
+    if downloader is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="File downloader not initialized"
+        )
+    
+    return downloader
+
+
+def get_analysis_cache(request: Request):
+    """
+    Get the cross-user analysis cache from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        AnalysisCache instance
+        
+    Raises:
+        HTTPException: If the cache is not initialized
+    """
+    cache = getattr(request.app.state, 'analysis_cache', None)
+    
+    if cache is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="Analysis cache not initialized"
+        )
+    
+    return cache
+
+
+def get_indexer(request: Request):
+    """
+    Get the background indexing queue from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        IndexingQueue instance
+        
+    Raises:
+        HTTPException: If the queue is not initialized
+    """
+    indexer = getattr(request.app.state, 'indexer', None)
+    
+    if indexer is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="Indexing queue not initialized"
+        )
+    
+    return indexer
+
+
+def get_analysis_jobs(request: Request):
+    """
+    Get the analysis job registry from app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        AnalysisJobs instance
+        
+    Raises:
+        HTTPException: If the registry is not initialized
+    """
+    analysis_jobs = getattr(request.app.state, 'analysis_jobs', None)
+    
+    if analysis_jobs is None:
+        raise HTTPException(
+            status_code=500, 
+            detail="Analysis jobs not initialized"
         )
     
-    return vector_store
+    return analysis_jobs
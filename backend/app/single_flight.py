@@ -0,0 +1,38 @@
+"""
+In-process coalescing of identical concurrent work.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    Callers arriving while a computation for their key is running await its
+    result instead of starting another. The computation runs as its own task,
+    so it finishes even if the caller that started it goes away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return ``fn()``'s result, sharing it with concurrent callers for ``key``.
+
+        Returns:
+            tuple: (result, whether the result came from another caller's computation)
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if not shared:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task), shared
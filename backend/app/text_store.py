@@ -0,0 +1,108 @@
+"""
+Content-addressed storage for resume and job description text.
+
+Analyses reference their texts by resume_hash / jd_hash instead of holding
+copies, so a resume compared with many job descriptions, or a job
+description used by many users, is stored once. Texts above
+TEXT_COMPRESS_MIN_BYTES are zlib-compressed.
+
+Analyses stored before the split still carry the texts inline; readers fall
+back to those fields.
+"""
+import datetime
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+from pymongo.errors import DuplicateKeyError
+
+from .models.content import JobDescriptionText, ResumeText, TextBlob
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = int(os.getenv("TEXT_COMPRESS_MIN_BYTES", 4096))
+
+
+def encode_text(text: str) -> dict:
+    """Storage fields for a text, compressing it when that pays off."""
+    data = text.encode()
+    if len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return {"text": None, "compressed": compressed, "size": len(data)}
+    return {"text": text, "compressed": None, "size": len(data)}
+
+
+def decode_text(blob: TextBlob) -> str:
+    if blob.compressed is not None:
+        return zlib.decompress(blob.compressed).decode()
+    return blob.text or ""
+
+
+async def _put(model: Type[TextBlob], content_hash: str, text: str):
+    # Content never changes for a hash, so only the first writer stores it
+    try:
+        await model.get_motor_collection().update_one(
+            {"content_hash": content_hash},
+            {
+                "$setOnInsert": {
+                    "content_hash": content_hash,
+                    "created_at": datetime.datetime.utcnow(),
+                    **encode_text(text),
+                }
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass
+
+
+async def _get_many(model: Type[TextBlob], hashes: Iterable[str]) -> Dict[str, str]:
+    unique = list(set(hashes))
+    if not unique:
+        return {}
+    blobs = await model.find({"content_hash": {"$in": unique}}).to_list()
+    return {blob.content_hash: decode_text(blob) for blob in blobs}
+
+
+async def put_texts(resume_hash: str, resume_text: str, jd_hash: str, job_description: str):
+    """Store the texts an analysis refers to."""
+    await _put(ResumeText, resume_hash, resume_text)
+    await _put(JobDescriptionText, jd_hash, job_description)
+
+
+async def get_resume_text(resume_hash: str) -> Optional[str]:
+    """Resume text by hash, or None if it is not stored."""
+    resumes = await _get_many(ResumeText, [resume_hash])
+    return resumes.get(resume_hash)
+
+
+async def get_job_descriptions(jd_hashes: Iterable[str]) -> Dict[str, str]:
+    """Job description texts by hash, in one query."""
+    return await _get_many(JobDescriptionText, jd_hashes)
+
+
+async def get_texts(
+    resume_hash: str,
+    jd_hash: str,
+    resume_text: Optional[str] = None,
+    job_description: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve the texts of an analysis.
+
+    Inline values from older records are used as they are; only missing
+    texts are looked up.
+
+    Returns:
+        tuple: (resume_text, job_description), None where no text is stored
+    """
+    if resume_text is None:
+        resume_text = await get_resume_text(resume_hash)
+
+    if job_description is None:
+        job_descriptions = await get_job_descriptions([jd_hash])
+        job_description = job_descriptions.get(jd_hash)
+
+    return resume_text, job_description
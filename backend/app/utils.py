@@ -1,40 +1,60 @@
 import logging
 import datetime
+import hashlib
 import httpx
-from typing import Dict, Any, Optional
-from langchain_community.document_loaders import PyPDFLoader
+from typing import Dict, Any, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain.docstore.document import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from fastapi import UploadFile, HTTPException
+import base64
 import json
-import tempfile
 import os
 from io import BytesIO
-from beanie import SortDirection
+from beanie import PydanticObjectId, SortDirection
+from pymongo.errors import DuplicateKeyError
 from .models.chat import ChatMessage
-from .models.resume import ResumeAnalysis, QueryResumeAnalysis
+from .models.resume import (
+    JD_SNIPPET_CHARS,
+    AnalysisCounter,
+    AnalysisExists,
+    QueryResumeAnalysis,
+    QueryResumeAnalysisNoJD,
+    QueryResumeAnalysisSnippet,
+    ResumeAnalysis,
+)
 from .models.user import User,UserCreate,UserUpdate 
+from .llm_executor import LLMExecutor
+from .prompts import AnalysisPrompt
+from .pdf_extraction import PDFExtractor, PDFLimitError
+from .extraction_cache import ExtractionCache
+from .downloads import FileDownloader, DownloadTooLargeError
+from .analysis_cache import AnalysisCache
+from .vector_store import has_content, mark_content_indexed
+from .text_store import get_job_descriptions
 
 
 logger = logging.getLogger(__name__)
 
+# Projection model passed to get_analysis_fields
+P = TypeVar("P", bound=BaseModel)
 
-def get_analysis(
+
+async def get_analysis(
     job_description: str,
     resume_text: str,
-    messages: list,
-    prompt: str,
+    prompt: AnalysisPrompt,
     model,
+    executor: LLMExecutor,
 ) -> Dict[str, Any]:
     """Analyze resume against job description using AI."""
     try:
-        # Format the prompt with resume text and job description
-        formatted_prompt = (prompt % (resume_text, job_description)).strip()
+        # Build a fresh message list for this request only
+        messages = prompt.build(resume_text, job_description)
 
-        # Generate analysis using Gemini AI
-        messages.append(HumanMessage(formatted_prompt))
-        response = model.invoke(messages)
+        # Generate analysis using Gemini AI without blocking the event loop
+        response = await executor.ainvoke(model, messages)
 
         result = response.content[7:-4].strip()
 
@@ -48,22 +68,44 @@ def get_analysis(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
+async def get_cached_analysis(
+    job_description: str,
+    resume_text: str,
+    resume_hash: str,
+    jd_hash: str,
+    prompt: AnalysisPrompt,
+    model,
+    executor: LLMExecutor,
+    cache: AnalysisCache,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Analyze resume against job description, reusing any user's earlier result for the same content.
+
+    Returns:
+        tuple: (analysis result, whether it came from the cache)
+    """
+    cached = await cache.get(resume_hash, jd_hash, prompt.version)
+    if cached is not None:
+        return cached, True
+
+    result = await get_analysis(job_description, resume_text, prompt, model, executor)
+    cache.put(resume_hash, jd_hash, prompt.version, result)
+    return result, False
+
+async def extract_text_from_pdf(pdf_file: UploadFile, extractor: PDFExtractor) -> str:
     """Extract text content from uploaded PDF file."""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            contents = await pdf_file.read()
-            temp_pdf.write(contents)
-            temp_pdf_path = temp_pdf.name
-
-        loader = PyPDFLoader(temp_pdf_path, mode="single", extract_images=False)
-        documents = loader.load()
+        contents = await pdf_file.read()
+        return await extractor.extract(contents)
 
-        return documents[0].page_content
+    except PDFLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     except Exception as e:
         print(e)
@@ -71,8 +113,31 @@ async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
             status_code=500, detail=f"Failed to extract text from PDF: {str(e)}"
         )
 
-    finally:
-        os.remove(temp_pdf_path)  # Clean up temporary file
+async def extract_resume_text(
+    pdf_file: UploadFile, extractor: PDFExtractor, cache: ExtractionCache
+) -> Tuple[str, str]:
+    """
+    Extract resume text and its hash, reusing earlier extractions of the same file.
+
+    Returns:
+        tuple: (resume_text, resume_hash)
+    """
+    contents = await pdf_file.read()
+    file_hash = cache.key(contents)
+
+    cached = await cache.get(file_hash)
+    if cached:
+        return cached
+
+    await pdf_file.seek(0)
+    resume_text = await extract_text_from_pdf(pdf_file, extractor)
+    resume_hash = hashlib.md5(resume_text.encode()).hexdigest()
+
+    # Only cache usable extractions; empty text is rejected by the caller
+    if resume_text.strip():
+        await cache.put(file_hash, resume_text, resume_hash)
+
+    return resume_text, resume_hash
 
 def add_to_vector_store(
     id,
@@ -86,31 +151,9 @@ def add_to_vector_store(
     """Add resume and job description to the vector store."""
     try:
 
-        # Check if this specific resume already exists
-        existing_resume = vector_store.similarity_search(
-            query="",
-            where={
-                "$and": [
-                    {"user_id": {"$eq": id}},
-                    {"document_type": {"$eq": "resume"}},
-                    {"content_hash": {"$eq": resume_hash}}
-                ]
-            },
-            k=1,
-        )
-
-        # Check if this specific job description already exists
-        existing_job = vector_store.similarity_search(
-            query="",
-            where={
-                "$and": [
-                    {"user_id": {"$eq": id}},
-                    {"document_type": {"$eq": "job_description"}},
-                    {"content_hash": {"$eq": job_hash}}
-                ]
-            },
-            k=1,
-        )
+        # Check if this specific resume and job description already exist
+        existing_resume = has_content(vector_store, id, "resume", resume_hash)
+        existing_job = has_content(vector_store, id, "job_description", job_hash)
 
         # Split text into manageable chunks
         text_splitter = RecursiveCharacterTextSplitter(
@@ -158,6 +201,8 @@ def add_to_vector_store(
         # Add documents to vector store if any new ones were created
         if documents:
             vector_store.add_documents(documents)
+            mark_content_indexed(id, "resume", resume_hash)
+            mark_content_indexed(id, "job_description", job_hash)
         else:
             print(f"No new documents to add for user {id}")
 
@@ -167,28 +212,192 @@ def add_to_vector_store(
             status_code=500, detail=f"Failed to add to vector store: {str(e)}"
         )
 
-async def get_analysis_by_hashes( user_id: str, resume_hash: str, jd_hash: str) -> Optional[ResumeAnalysis]:
-    """Get existing analysis by resume and job description hashes"""
+def analysis_filter(user_id: str, resume_hash: str, jd_hash: str) -> dict:
+    """Filter matching one analysis; served by the unique (user_id, resume_hash, jd_hash) index."""
+    return {"user_id": user_id, "resume_hash": resume_hash, "jd_hash": jd_hash}
+
+
+async def get_analysis_fields(
+    user_id: str, resume_hash: str, jd_hash: str, projection_model: Type[P]
+) -> Optional[P]:
+    """
+    Read only the fields of ``projection_model`` from one analysis.
+
+    Mongo returns just the projected fields and only they are validated,
+    instead of loading and validating the whole ResumeAnalysis document.
+
+    Returns None only when no such analysis exists; database errors are
+    raised, so callers never mistake an outage for a missing analysis.
+    """
+    return await ResumeAnalysis.find_one(
+        analysis_filter(user_id, resume_hash, jd_hash),
+        projection_model=projection_model,
+    )
+
+
+async def analysis_exists(user_id: str, resume_hash: str, jd_hash: str) -> bool:
+    """Whether the user already has this analysis; database errors are raised."""
+    return await get_analysis_fields(user_id, resume_hash, jd_hash, AnalysisExists) is not None
+
+
+async def update_analysis_score(
+    user_id: str, resume_hash: str, jd_hash: str, score: float, weights: Dict[str, float]
+) -> bool:
+    """
+    Set the ATS score and weights of an analysis in one atomic update.
+
+    Returns:
+        bool: False if no such analysis exists
+    """
+    result = await ResumeAnalysis.get_motor_collection().update_one(
+        analysis_filter(user_id, resume_hash, jd_hash),
+        {"$set": {"ats_score": score, "weights": weights}},
+    )
+    return result.matched_count > 0
+
+
+# History projections by how much of the job description to return
+ANALYSIS_LIST_PROJECTIONS = {
+    "full": QueryResumeAnalysis,
+    "snippet": QueryResumeAnalysisSnippet,
+    "none": QueryResumeAnalysisNoJD,
+}
+
+
+def encode_analysis_cursor(created_at: datetime.datetime, analysis_id: PydanticObjectId) -> str:
+    """Opaque cursor pointing just past one history row."""
+    raw = f"{created_at.isoformat()}|{analysis_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_analysis_cursor(cursor: str) -> Tuple[datetime.datetime, PydanticObjectId]:
+    """
+    Parse a cursor from encode_analysis_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, analysis_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), PydanticObjectId(analysis_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def get_user_analyses_from_db(
+    user_id: str,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    jd: str = "full",
+) -> Tuple[list, Optional[str]]:
+    """
+    Get a page of a user's analyses, newest first.
+
+    Pages are read by keyset on (created_at, _id) using the cursor from the
+    previous page, so deep pages cost the same as the first. ``offset`` is
+    still honoured when no cursor is given.
+
+    Returns:
+        tuple: (analyses, cursor for the next page or None on the last page)
+
+    Raises:
+        ValueError: If the cursor or jd option is invalid
+    """
+    projection_model = ANALYSIS_LIST_PROJECTIONS.get(jd)
+    if projection_model is None:
+        raise ValueError(f"jd must be one of {', '.join(ANALYSIS_LIST_PROJECTIONS)}")
+
+    query = {"user_id": user_id}
+    if cursor:
+        created_at, analysis_id = decode_analysis_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": analysis_id}},
+        ]
+
     try:
-        return await ResumeAnalysis.find_one(
-            ResumeAnalysis.user_id == user_id,
-            ResumeAnalysis.resume_hash == resume_hash,
-            ResumeAnalysis.jd_hash == jd_hash,
+        find = ResumeAnalysis.find(query, projection_model=projection_model).sort(
+            [("created_at", SortDirection.DESCENDING), ("_id", SortDirection.DESCENDING)]
         )
+        if offset and not cursor:
+            find = find.skip(offset)
+
+        # One extra row tells us whether another page exists
+        analyses = await find.limit(limit + 1).to_list()
     except Exception as e:
-        logger.error(f"Error getting analysis by hashes: {e}")
-        return None
+        logger.error(f"Error getting user analyses: {e}")
+        return [], None
+
+    next_cursor = None
+    if len(analyses) > limit:
+        analyses = analyses[:limit]
+        last = analyses[-1]
+        next_cursor = encode_analysis_cursor(last.created_at, last.id)
+
+    if jd != "none":
+        await fill_job_descriptions(analyses, JD_SNIPPET_CHARS if jd == "snippet" else None)
+
+    return analyses, next_cursor
+
+
+async def fill_job_descriptions(analyses: list, max_chars: Optional[int] = None):
+    """
+    Add job descriptions from the text store to rows that do not carry one inline.
+
+    Snippet rows only get here for analyses stored before jd_snippet existed.
+    """
+    missing = [a for a in analyses if not a.job_description]
+    if not missing:
+        return
 
-async def get_user_analyses_from_db(user_id:str,limit:int,offset:int):
-    """Get all analyses for a user with pagination"""
     try:
-        return await ResumeAnalysis.find(
-            ResumeAnalysis.user_id == user_id,
-            projection_model=QueryResumeAnalysis
-        ).sort([("created_at", SortDirection.DESCENDING)]).skip(offset).limit(limit).to_list()
+        texts = await get_job_descriptions(a.jd_hash for a in missing)
     except Exception as e:
-        logger.error(f"Error getting user analyses: {e}")
-        return []
+        logger.error(f"Error loading job descriptions: {e}")
+        return
+
+    for analysis in missing:
+        text = texts.get(analysis.jd_hash)
+        if text is not None:
+            analysis.job_description = text[:max_chars] if max_chars else text
+
+
+async def increment_analysis_count(user_id: str):
+    """
+    Count a newly stored analysis.
+
+    The upsert makes the counter authoritative from a user's first analysis;
+    users with analyses from before counters existed are backfilled by
+    migrations/backfill_analysis_counters.py.
+    """
+    for attempt in range(2):
+        try:
+            await AnalysisCounter.get_motor_collection().update_one(
+                {"user_id": user_id},
+                {"$inc": {"count": 1}},
+                upsert=True,
+            )
+            return
+        except DuplicateKeyError:
+            # Two first analyses raced to create the counter; the retry increments it
+            if attempt:
+                logger.error(f"Error updating analysis count for {user_id}: duplicate counter")
+        except Exception as e:
+            logger.error(f"Error updating analysis count: {e}")
+            return
+
+
+async def get_analysis_count(user_id: str) -> int:
+    """Number of analyses stored for a user, read from their counter."""
+    counter = await AnalysisCounter.find_one(AnalysisCounter.user_id == user_id)
+    if counter is not None:
+        return counter.count
+
+    # No analyses since counters were introduced; count any older ones without
+    # writing, so reads can never race inserts into a wrong counter
+    return await ResumeAnalysis.find(ResumeAnalysis.user_id == user_id).count()
+
 
 async def get_user_by_clerk_id(clerk_user_id: str) -> Optional[User]:
     """Get user by Clerk user ID"""
@@ -231,6 +440,7 @@ async def delete_user(clerk_user_id: str) -> bool:
     try:
         # Delete user's analysis records first
         await ResumeAnalysis.find(ResumeAnalysis.user_id == clerk_user_id).delete()
+        await AnalysisCounter.find(AnalysisCounter.user_id == clerk_user_id).delete()
 
         # Delete user
         user = await User.find_one(User.clerk_user_id == clerk_user_id)
@@ -244,16 +454,16 @@ async def delete_user(clerk_user_id: str) -> bool:
         return False
 
 async def get_chat_history_for_rag(user_id: str, resume_hash: str, jd_hash: str) -> list:
-    """Get chat history and format it for the RAG chain."""
+    """Get the latest 20 chat messages, oldest first, formatted for the RAG chain."""
     try:
         messages = await ChatMessage.find(
             ChatMessage.user_id == user_id,
             ChatMessage.resume_hash == resume_hash,
             ChatMessage.jd_hash == jd_hash
-        ).sort([("created_at", SortDirection.ASCENDING)]).limit(20).to_list()
+        ).sort([("created_at", SortDirection.DESCENDING)]).limit(20).to_list()
 
         history = []
-        for msg in messages:
+        for msg in reversed(messages):
             if msg.role == 'user':
                 history.append(HumanMessage(content=msg.message))
             elif msg.role == 'assistant':
@@ -277,19 +487,22 @@ async def get_chat_history_for_user(user_id: str, resume_hash: str, jd_hash: str
         logger.error(f"Error getting chat history for RAG: {e}")
         return []
 
-async def download_file_from_url(file_url: str, filename: Optional[str] = None) -> UploadFile:
+async def download_file_from_url(
+    file_url: str, downloader: FileDownloader, filename: Optional[str] = None
+) -> UploadFile:
     """
     Download a file from a URL and return an UploadFile object that can be used with extract_text_from_pdf.
     
     Args:
         file_url (str): The URL to download the file from
+        downloader (FileDownloader): App-lifetime pooled downloader
         filename (str, optional): The filename to use. If not provided, extracts from URL
     
     Returns:
         UploadFile: An UploadFile object containing the downloaded file content
     
     Raises:
-        HTTPException: If download fails or file is not accessible
+        HTTPException: If download fails, the file is too large or not accessible
     """
     try:
         # Extract filename from URL if not provided
@@ -298,27 +511,22 @@ async def download_file_from_url(file_url: str, filename: Optional[str] = None)
             if not filename.endswith('.pdf'):
                 filename += '.pdf'
         
-        # Download the file
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(file_url)
-            response.raise_for_status()
+        # Download the file over the shared connection pool
+        content = await downloader.fetch(file_url)
 
+        # Create a BytesIO object from the downloaded content
+        file_content = BytesIO(content)
+        
+        # Create an UploadFile object (without content_type parameter)
+        return UploadFile(
+            filename=filename,
+            file=file_content,
+            size=len(content)
+        )
             
-            # Create a BytesIO object from the downloaded content
-            file_content = BytesIO(response.content)
-            
-            # Create an UploadFile object (without content_type parameter)
-            upload_file = UploadFile(
-                filename=filename,
-                file=file_content,
-                size=len(response.content)
-            )
-            
-            # Reset file pointer to beginning for reading
-            file_content.seek(0)
-            
-            return upload_file
-            
+    except DownloadTooLargeError as e:
+        logger.error(f"File at {file_url} is too large: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
     except httpx.RequestError as e:
         logger.error(f"Network error downloading file from {file_url}: {e}")
         raise HTTPException(
@@ -337,4 +545,3 @@ async def download_file_from_url(file_url: str, filename: Optional[str] = None)
             status_code=500, 
             detail=f"Failed to download file from URL: {str(e)}"
         )
-
@@ -1,6 +1,9 @@
 import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from .embeddings import get_embeddings, collection_name_for
 
 
 def get_vector_store():
@@ -10,7 +13,7 @@ def get_vector_store():
     Returns:
         Chroma: ChromaDB vector store instance
     """
-    embeddings = HuggingFaceEmbeddings(model_name="BAAI/bge-large-en-v1.5")
+    embeddings = get_embeddings()
 
     # Get the backend directory path
     backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -22,6 +25,66 @@ def get_vector_store():
     return Chroma(
         embedding_function=embeddings,
         persist_directory=persist_directory,
-        collection_name="resumes",
+        collection_name=collection_name_for(embeddings.model_name),
     )
 
+
+# (user_id, document_type, content_hash) entries known to be stored. Vectors
+# are never deleted, so a positive answer can be remembered; the least recently
+# used entries are forgotten past INDEXED_CONTENT_CACHE_SIZE and looked up again.
+INDEXED_CONTENT_CACHE_SIZE = int(os.getenv("INDEXED_CONTENT_CACHE_SIZE", 10000))
+_indexed_content: "OrderedDict[Tuple[str, str, str], None]" = OrderedDict()
+# Indexing runs in worker threads
+_indexed_content_lock = threading.Lock()
+
+
+def _remember_indexed(key: Tuple[str, str, str]):
+    with _indexed_content_lock:
+        _indexed_content[key] = None
+        _indexed_content.move_to_end(key)
+        while len(_indexed_content) > INDEXED_CONTENT_CACHE_SIZE:
+            _indexed_content.popitem(last=False)
+
+
+def _known_indexed(key: Tuple[str, str, str]) -> bool:
+    with _indexed_content_lock:
+        if key not in _indexed_content:
+            return False
+        _indexed_content.move_to_end(key)
+        return True
+
+
+def has_content(vector_store, user_id: str, document_type: str, content_hash: str) -> bool:
+    """
+    Check whether chunks for a document are already in the vector store.
+
+    Uses a metadata-only lookup, so no query is embedded and no ANN search runs.
+    
+    Returns:
+        bool: True if at least one chunk exists
+    """
+    key = (user_id, document_type, content_hash)
+    if _known_indexed(key):
+        return True
+
+    found = vector_store.get(
+        where={
+            "$and": [
+                {"user_id": {"$eq": user_id}},
+                {"document_type": {"$eq": document_type}},
+                {"content_hash": {"$eq": content_hash}}
+            ]
+        },
+        limit=1,
+        include=[],
+    )
+
+    if found["ids"]:
+        _remember_indexed(key)
+        return True
+    return False
+
+
+def mark_content_indexed(user_id: str, document_type: str, content_hash: str):
+    """Record that chunks for a document were just added."""
+    _remember_indexed((user_id, document_type, content_hash))
@@ -0,0 +1,67 @@
+"""
+Background loading of slow startup resources.
+
+Lets the HTTP server bind immediately while heavy resources such as the
+embedding model and Chroma load in a worker thread. Callers that need the
+resource await it; everything else serves straight away.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundResource:
+    """A resource built once in a thread, awaitable until it is ready."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.load_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @property
+    def status(self) -> str:
+        if self.ready:
+            return "ready"
+        if self.error is not None:
+            return "failed"
+        return "loading"
+
+    def start(self) -> asyncio.Task:
+        """Begin loading in the background; safe to call more than once."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._load())
+        return self._task
+
+    async def _load(self):
+        started = time.perf_counter()
+        try:
+            self.value = await asyncio.to_thread(self.factory)
+            self.load_seconds = time.perf_counter() - started
+            logger.info(f"{self.name} ready in {self.load_seconds:.1f}s")
+        except Exception as e:
+            self.error = e
+            logger.error(f"Failed to load {self.name}: {e}")
+            raise
+        return self.value
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the resource and return it.
+
+        Raises:
+            asyncio.TimeoutError: If it is not ready within ``timeout`` seconds
+            Exception: Whatever the factory raised if loading failed
+        """
+        if self.ready:
+            return self.value
+        return await asyncio.wait_for(asyncio.shield(self.start()), timeout)
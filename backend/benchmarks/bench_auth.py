@@ -0,0 +1,92 @@
+"""
+Microbenchmark: per-request cost of JWT verification in the auth middleware.
+
+Runs against a local JWKS stand-in (httpx.MockTransport with a fixed fetch
+latency), so no identity provider is needed.
+
+- "fetch+verify": a JWKS fetch and RS256 check on every call, the worst case
+  of the old PyJWKClient lookup
+- "verify": signing key cached by kid, RS256 check on every call
+- "cached": repeat calls served from the verified-token cache
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_auth [--calls 2000] [--jwks-ms 50]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+os.environ.setdefault("JWKS_ENDPOINT", "https://jwks.local/.well-known/jwks.json")
+
+from app.middleware import authMiddleware
+from app.middleware.auth_cache import JWKSCache, VerifiedTokenCache
+
+KID = "bench-key"
+
+
+def make_token_and_jwks():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": KID, "use": "sig", "alg": "RS256"})
+
+    token = jwt.encode(
+        {"sub": "user_bench", "exp": int(time.time()) + 3600},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": KID},
+    )
+    return token, {"keys": [jwk]}
+
+
+def jwks_client(jwks: dict, delay: float) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=jwks)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def run(mode: str, token: str, jwks: dict, calls: int, delay: float) -> float:
+    cache = JWKSCache("https://jwks.local/.well-known/jwks.json", jwks_client(jwks, delay))
+    authMiddleware.jwks_cache = cache
+    authMiddleware.verified_tokens = VerifiedTokenCache(
+        max_entries=10_000 if mode == "cached" else 0
+    )
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        if mode == "fetch+verify":
+            await cache.refresh()
+            key = await cache.get_signing_key(KID)
+            jwt.decode(token, key, algorithms=["RS256"])
+        else:
+            await authMiddleware.verify_token(token)
+    elapsed = time.perf_counter() - start
+
+    await cache.aclose()
+    return elapsed / calls * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--jwks-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    token, jwks = make_token_and_jwks()
+
+    print(f"{'mode':14} {'us/call':>10}")
+    for mode in ("fetch+verify", "verify", "cached"):
+        # Network-bound mode gets fewer calls so the run stays short
+        calls = min(args.calls, 50) if mode == "fetch+verify" else args.calls
+        per_call = await run(mode, token, jwks, calls, args.jwks_ms / 1000)
+        print(f"{mode:14} {per_call:10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
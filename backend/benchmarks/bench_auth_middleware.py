@@ -0,0 +1,112 @@
+"""
+Microbenchmark: auth middleware overhead per request.
+
+Sends requests through a minimal Starlette app over httpx's ASGI transport:
+- "none": no auth middleware, the baseline
+- "http": the previous @app.middleware("http") function (BaseHTTPMiddleware,
+  skip list rebuilt and scanned on each request)
+- "asgi": AuthMiddleware with precompiled route policies
+
+Tokens are pre-verified so the numbers isolate middleware plumbing rather
+than RS256; see bench_auth for verification costs.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_auth_middleware [--requests 5000]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import jwt
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks.bench_auth import make_token_and_jwks
+from app.middleware import authMiddleware
+from app.middleware.authMiddleware import AuthMiddleware, verify_token
+
+
+async def legacy_auth_middleware(request: Request, call_next):
+    """The middleware as it was registered before, for comparison."""
+    if request.method == "OPTIONS":
+        return await call_next(request)
+
+    skip_paths = ["/webhooks", "/health", "/docs", "/redoc", "/openapi.json"]
+
+    if any(request.url.path.startswith(path) or request.url.path == '/' for path in skip_paths):
+        return await call_next(request)
+
+    auth_header = request.headers.get("Authorization")
+    token = None
+
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+
+    if not token:
+        return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+
+    try:
+        payload = await verify_token(token)
+        request.state._state['user_id'] = payload.get("sub")
+    except jwt.InvalidTokenError as e:
+        return JSONResponse(status_code=401, content={"detail": str(e)})
+
+    return await call_next(request)
+
+
+async def endpoint(request: Request):
+    return JSONResponse({"user_id": request.state._state.get("user_id")})
+
+
+def build_app(mode: str) -> Starlette:
+    app = Starlette(routes=[
+        Route("/analysis/get-analysis", endpoint, methods=["POST"]),
+        Route("/health/live", endpoint),
+    ])
+    if mode == "http":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_auth_middleware)
+    elif mode == "asgi":
+        app.add_middleware(AuthMiddleware)
+    return app
+
+
+async def run(mode: str, token: str, requests: int, path: str) -> float:
+    transport = httpx.ASGITransport(app=build_app(mode))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        method = client.post if path.startswith("/analysis") else client.get
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await method(path, headers=headers)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+
+    return elapsed / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    token, _ = make_token_and_jwks()
+    # Seed the verified-token cache so no signing key is needed
+    authMiddleware.verified_tokens.put(token, jwt.decode(token, options={"verify_signature": False}))
+
+    baselines = {}
+    print(f"{'mode':6} {'path':24} {'us/req':>8} {'overhead':>9}")
+    for path in ("/analysis/get-analysis", "/health/live"):
+        for mode in ("none", "http", "asgi"):
+            per_request = await run(mode, token, args.requests, path)
+            baselines.setdefault(path, per_request)
+            overhead = per_request - baselines[path]
+            print(f"{mode:6} {path:24} {per_request:8.1f} {overhead:9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Load test: concurrent vector-path chat turns per worker, sync vs async chain.
+
+Simulates the /chat/message RAG branch inside one event loop with N clients
+in flight. "before" calls chain.invoke() from the async handler, as the
+endpoint used to; "after" awaits chain.ainvoke(). Embedding, Chroma search
+and the LLM are stubs with fixed latencies, so the difference is purely
+event-loop blocking.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_chat_concurrency [--clients 16] [--turns 64]
+"""
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.rag import get_rag_chain
+from benchmarks.bench_query_rewrite import StubVectorStore, stub_llm
+
+HISTORY = [
+    HumanMessage(content="Which skills match the job description?"),
+    AIMessage(content="Python, FastAPI and MongoDB."),
+]
+QUESTION = "What experience do I have with cloud platforms like AWS?"
+
+
+async def run(mode: str, clients: int, turns: int, llm_delay: float, search_delay: float) -> float:
+    chain = get_rag_chain(
+        stub_llm(llm_delay, []), StubVectorStore(search_delay), "user", "resume", "jd"
+    )
+    inputs = {"input": QUESTION, "chat_history": HISTORY}
+    semaphore = asyncio.Semaphore(clients)
+
+    async def turn():
+        async with semaphore:
+            if mode == "before":
+                chain.invoke(inputs)
+            else:
+                await chain.ainvoke(inputs)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn() for _ in range(turns)))
+    return turns / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=64)
+    parser.add_argument("--llm-ms", type=float, default=500)
+    parser.add_argument("--search-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    print(f"{'mode':8} {'clients':>7} {'turns/s':>8}")
+    for mode in ("before", "after"):
+        throughput = await run(
+            mode, args.clients, args.turns, args.llm_ms / 1000, args.search_ms / 1000
+        )
+        print(f"{mode:8} {args.clients:7} {throughput:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
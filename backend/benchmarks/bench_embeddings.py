@@ -0,0 +1,141 @@
+"""
+Embedding backend benchmark: throughput and retrieval agreement.
+
+For each model/backend option, embeds a corpus of resume and job description
+chunks one call at a time and again through concurrent callers sharing the
+micro-batcher. Retrieval quality is reported as top-k overlap with the
+bge-large float32 baseline on the same queries.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_embeddings [--corpus chunks.txt] [--threads 4]
+
+The ONNX options need `pip install sentence-transformers[onnx]`.
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.embeddings import BatchingEmbeddings, load_sentence_transformer
+
+OPTIONS = [
+    ("bge-large", "torch", "float32"),
+    ("bge-large", "torch", "float16"),
+    ("bge-base", "torch", "float32"),
+    ("bge-small", "torch", "float32"),
+    ("bge-small", "onnx", "float32"),
+    ("bge-small", "onnx-int8", "float32"),
+]
+
+SKILLS = [
+    "Python", "FastAPI", "MongoDB", "React", "TypeScript", "Kubernetes", "AWS",
+    "PyTorch", "SQL", "Docker", "GraphQL", "Terraform", "Go", "Spark", "Redis",
+]
+ROLES = ["backend engineer", "data scientist", "frontend developer", "ML engineer", "SRE"]
+QUERIES = [
+    "Which cloud platforms has the candidate used?",
+    "What backend frameworks does the job require?",
+    "Where did the candidate work most recently?",
+    "What machine learning experience is listed?",
+    "Which database skills match the job description?",
+    "What experience with containers and orchestration is there?",
+]
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n):
+        skills = ", ".join(rng.sample(SKILLS, 5))
+        role = rng.choice(ROLES)
+        years = rng.randint(1, 12)
+        chunks.append(
+            f"Worked as a {role} for {years} years at Company {i % 40}, "
+            f"building services with {skills}. Led projects improving latency "
+            f"and reliability, mentored engineers and owned production on-call."
+        )
+    return chunks
+
+
+def top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> list:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    return [set(np.argsort(-row)[:k]) for row in scores]
+
+
+def run(option, corpus, threads, callers):
+    model_name, backend, dtype = option
+    start = time.perf_counter()
+    model = load_sentence_transformer(model_name, backend=backend, dtype=dtype, threads=threads)
+    load_s = time.perf_counter() - start
+
+    # Sequential, one chunk per call: the pre-batching request pattern
+    start = time.perf_counter()
+    for chunk in corpus[:64]:
+        model.encode([chunk])
+    sequential = 64 / (time.perf_counter() - start)
+
+    # Concurrent callers sharing the micro-batcher
+    embeddings = BatchingEmbeddings(model, model_name=model_name)
+    slices = [corpus[i::callers] for i in range(callers)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(callers) as pool:
+        results = list(pool.map(embeddings.embed_documents, slices))
+    batched = len(corpus) / (time.perf_counter() - start)
+
+    # Reassemble in corpus order
+    vectors = [None] * len(corpus)
+    for i, part in enumerate(results):
+        vectors[i::callers] = part
+    queries = embeddings.embed_documents(QUERIES)
+
+    return {
+        "load_s": load_s,
+        "sequential": sequential,
+        "batched": batched,
+        "avg_batch": embeddings.stats["avg_batch_size"],
+        "vectors": np.asarray(vectors, dtype=np.float32),
+        "queries": np.asarray(queries, dtype=np.float32),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="File with one chunk per line")
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.size)
+
+    baseline = None
+    print(f"{'option':32} {'load s':>7} {'seq/s':>8} {'batch/s':>8} {'avg bs':>7} {'overlap@k':>9}")
+    for option in OPTIONS:
+        try:
+            result = run(option, corpus, args.threads, args.callers)
+        except Exception as e:
+            print(f"{'/'.join(option):32} skipped: {e}")
+            continue
+
+        hits = top_k(result["vectors"], result["queries"], args.k)
+        if baseline is None:
+            baseline = hits
+        overlap = np.mean([len(a & b) / args.k for a, b in zip(hits, baseline)])
+
+        print(
+            f"{'/'.join(option):32} {result['load_s']:7.1f} {result['sequential']:8.1f} "
+            f"{result['batched']:8.1f} {result['avg_batch']:7.1f} {overlap:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Microbenchmark: full ResumeAnalysis loads vs projected reads.
+
+Inserts synthetic analyses into a scratch database, then times per lookup:
+- "document": find_one returning a validated ResumeAnalysis (the old path)
+- "projection": find_one with projection_model=AnalysisTexts
+- "raw": Motor find_one with a projection, no model validation
+and, without the round trip, the Pydantic validation cost of the full
+document against the projected model.
+
+Needs a reachable MongoDB (MONGODB_URI, default localhost). The scratch
+database is dropped afterwards.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_projection [--docs 200] [--reads 2000] [--inline-texts]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.resume import AnalysisTexts, ResumeAnalysis
+
+DB_NAME = "CVCompare_bench_projection"
+
+
+def synthetic_analysis(i: int, inline_texts: bool) -> ResumeAnalysis:
+    words = [f"word{n}" for n in range(400)]
+    analysis_result = {
+        "summary": " ".join(random.choices(words, k=300)),
+        "skills": [{"name": f"skill{n}", "match": random.random()} for n in range(40)],
+        "sections": {f"section{n}": " ".join(random.choices(words, k=80)) for n in range(10)},
+    }
+    return ResumeAnalysis(
+        user_id="user_bench",
+        resume_hash=f"resume{i}",
+        jd_hash=f"jd{i}",
+        analysis_result=analysis_result,
+        resume_filename="resume.pdf",
+        resume_text=" ".join(random.choices(words, k=1500)) if inline_texts else None,
+        job_description=" ".join(random.choices(words, k=500)) if inline_texts else None,
+    )
+
+
+async def time_reads(reads: int, docs: int, read) -> float:
+    start = time.perf_counter()
+    for _ in range(reads):
+        i = random.randrange(docs)
+        await read({"user_id": "user_bench", "resume_hash": f"resume{i}", "jd_hash": f"jd{i}"})
+    return (time.perf_counter() - start) / reads * 1e6
+
+
+def time_validation(reads: int, model, raw: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(reads):
+        model.model_validate(raw)
+    return (time.perf_counter() - start) / reads * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--inline-texts", action="store_true", help="Store texts inline like pre-split records")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    db = client[DB_NAME]
+    await init_beanie(database=db, document_models=[ResumeAnalysis])
+    collection = ResumeAnalysis.get_motor_collection()
+
+    try:
+        await ResumeAnalysis.insert_many(
+            [synthetic_analysis(i, args.inline_texts) for i in range(args.docs)]
+        )
+
+        projection = {"resume_text": 1, "job_description": 1}
+        rows = [
+            ("document", lambda f: ResumeAnalysis.find_one(f)),
+            ("projection", lambda f: ResumeAnalysis.find_one(f, projection_model=AnalysisTexts)),
+            ("raw", lambda f: collection.find_one(f, projection)),
+        ]
+
+        print(f"{'read':12} {'us/read':>9}")
+        for name, read in rows:
+            print(f"{name:12} {await time_reads(args.reads, args.docs, read):9.1f}")
+
+        raw_doc = await collection.find_one({"resume_hash": "resume0"})
+        raw_projected = await collection.find_one({"resume_hash": "resume0"}, projection)
+
+        print(f"\n{'validate':12} {'us/doc':>9}")
+        print(f"{'document':12} {time_validation(args.reads, ResumeAnalysis, raw_doc):9.1f}")
+        print(f"{'projection':12} {time_validation(args.reads, AnalysisTexts, raw_projected):9.1f}")
+
+    finally:
+        await client.drop_database(DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
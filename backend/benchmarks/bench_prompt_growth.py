@@ -0,0 +1,68 @@
+"""
+Regression benchmark: prompt size and memory must stay flat across analyses.
+
+Runs get_analysis 1,000 times against a stub model and records how many
+messages and characters reach the model, plus traced memory.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_prompt_growth
+"""
+import asyncio
+import os
+import sys
+import tracemalloc
+
+from app.llm_executor import LLMExecutor
+from app.prompts import AnalysisPrompt
+from app.utils import get_analysis
+
+ROUTER_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "router")
+RUNS = 1000
+
+
+class StubModel:
+    """Records the size of each prompt and returns a fixed JSON payload."""
+
+    def __init__(self):
+        self.sizes = []
+
+    async def ainvoke(self, messages):
+        self.sizes.append((len(messages), sum(len(m.content) for m in messages)))
+        return type("Response", (), {"content": '```json\n{"ok": true}\n```'})()
+
+
+async def main():
+    with open(os.path.join(ROUTER_DIR, "prompt.txt")) as f:
+        prompt = f.read()
+    with open(os.path.join(ROUTER_DIR, "system_prompt.txt")) as f:
+        system_prompt = f.read()
+
+    analysis_prompt = AnalysisPrompt(system_prompt, prompt)
+    model = StubModel()
+    executor = LLMExecutor(max_concurrency=1, max_queue=RUNS)
+
+    tracemalloc.start()
+    memory = []
+    for i in range(RUNS):
+        resume = f"Resume {i}: " + "python fastapi mongodb " * 200
+        jd = f"Job {i}: " + "backend engineer " * 100
+        await get_analysis(jd, resume, analysis_prompt, model, executor)
+        if i in (9, RUNS - 1):
+            memory.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+
+    first, last = model.sizes[0], model.sizes[-1]
+    print(f"runs:            {RUNS}")
+    print(f"messages/call:   first={first[0]} last={last[0]}")
+    print(f"chars/call:      first={first[1]} last={last[1]}")
+    print(f"traced memory:   after 10={memory[0] / 1024:.1f} KiB after {RUNS}={memory[1] / 1024:.1f} KiB")
+
+    flat = first[0] == last[0] and abs(last[1] - first[1]) < 100
+    # Allow some slack for interpreter caches, but not per-call growth
+    flat = flat and memory[1] - memory[0] < 512 * 1024
+    print("result:          " + ("FLAT" if flat else "GROWING"))
+    return 0 if flat else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,114 @@
+"""
+Per-turn chat latency with and without the query-rewrite skip.
+
+Replays a scripted conversation through get_rag_chain with a stub LLM that
+sleeps for a fixed round-trip time and a stub vector store, once with
+CHAT_QUERY_REWRITE=always (the previous behaviour) and once with auto.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_query_rewrite [--llm-ms 800] [--search-ms 40]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.rag import get_rag_chain
+
+CONVERSATION = [
+    "Hi there!",
+    "Which skills in my resume match the job description?",
+    "What experience do I have with cloud platforms like AWS?",
+    "Why is that not enough?",
+    "Which projects best show backend experience?",
+    "Tell me more",
+    "What did I do at my most recent employer?",
+    "How many years of Python experience does the job require?",
+    "Can you elaborate on the second point?",
+    "Which certifications are missing from my resume for this role?",
+]
+
+
+class StubEmbeddings:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return [0.0] * 8
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.delay)
+        return [0.0] * 8
+
+
+class StubVectorStore:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.embeddings = StubEmbeddings(delay / 2)
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None):
+        time.sleep(self.delay)
+        return [Document(page_content=f"chunk {i}") for i in range(k)]
+
+
+def stub_llm(delay: float, calls: list):
+    async def respond(_):
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return AIMessage(content="stub answer")
+
+    def respond_sync(_):
+        calls.append(1)
+        time.sleep(delay)
+        return AIMessage(content="stub answer")
+
+    return RunnableLambda(respond_sync, afunc=respond)
+
+
+async def replay(mode: str, llm_delay: float, search_delay: float):
+    os.environ["CHAT_QUERY_REWRITE"] = mode
+    calls = []
+    chain = get_rag_chain(
+        stub_llm(llm_delay, calls), StubVectorStore(search_delay), "user", "resume", "jd"
+    )
+
+    history, latencies = [], []
+    for question in CONVERSATION:
+        start = time.perf_counter()
+        response = await chain.ainvoke({"input": question, "chat_history": history})
+        latencies.append(time.perf_counter() - start)
+        history += [HumanMessage(content=question), AIMessage(content=response["answer"])]
+
+    return latencies, len(calls)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=800)
+    parser.add_argument("--search-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("always", "auto"):
+        results[mode] = await replay(mode, args.llm_ms / 1000, args.search_ms / 1000)
+
+    print(f"{'mode':8} {'turns':>5} {'llm calls':>9} {'mean ms':>8} {'p50 ms':>8} {'max ms':>8}")
+    for mode, (latencies, calls) in results.items():
+        ms = [l * 1000 for l in latencies]
+        print(
+            f"{mode:8} {len(ms):5} {calls:9} {statistics.mean(ms):8.0f} "
+            f"{statistics.median(ms):8.0f} {max(ms):8.0f}"
+        )
+
+    saved = statistics.mean(results["always"][0]) - statistics.mean(results["auto"][0])
+    print(f"mean per-turn saving: {saved * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
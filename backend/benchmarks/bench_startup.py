@@ -0,0 +1,62 @@
+"""
+Startup-time benchmark: time to serve traffic vs. time to be fully warm.
+
+Starts uvicorn once per warm-up mode and polls /health/live (server bound
+and serving) and /health/ready (embedding model and vector store loaded).
+Needs the same environment as the app itself (.env with MONGODB_URI,
+GOOGLE_API_KEY, JWKS_ENDPOINT).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup [--port 8765] [--timeout 300]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    return float("nan")
+
+
+def measure(mode: str, port: int, timeout: float) -> tuple:
+    env = {**os.environ, "WARMUP_MODE": mode}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}/health"
+        live = wait_for(f"{base}/live", started, timeout)
+        ready = wait_for(f"{base}/ready", started, timeout)
+        return live, ready
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'mode':12} {'live s':>8} {'ready s':>8}")
+    for mode in ("eager", "background"):
+        live, ready = measure(mode, args.port, args.timeout)
+        print(f"{mode:12} {live:8.2f} {ready:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+One-off backfill of analysis_counters from the analyses collection.
+
+Counters are incremented (and created) on every new analysis, so users whose
+analyses predate the counters need their totals set once. Run it with the
+API stopped so no analysis is inserted while counts are taken; re-running is
+safe and resets every counter to the true count.
+
+Usage (from the backend directory, with MONGODB_URI set):
+    python -m migrations.backfill_analysis_counters [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+DB_NAME = "CVCompare"
+
+
+async def backfill(db, dry_run: bool = False) -> int:
+    counts = db["analyses"].aggregate(
+        [{"$group": {"_id": "$user_id", "count": {"$sum": 1}}}]
+    )
+    updates = [
+        UpdateOne({"user_id": row["_id"]}, {"$set": {"count": row["count"]}}, upsert=True)
+        async for row in counts
+    ]
+
+    if updates and not dry_run:
+        await db["analysis_counters"].bulk_write(updates, ordered=False)
+    return len(updates)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+    try:
+        users = await backfill(client[DB_NAME], args.dry_run)
+        action = "Would set" if args.dry_run else "Set"
+        print(f"{action} analysis counters for {users} users")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
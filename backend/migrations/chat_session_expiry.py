@@ -0,0 +1,59 @@
+"""
+One-off migration moving chat session expiry to a per-document expires_at.
+
+The old TTL index on updated_at took its expireAfterSeconds from
+CHAT_SESSION_IDLE_SECONDS, so changing that setting conflicted with the
+existing index and stopped the API from starting. Sessions now carry their own
+expires_at under a fixed index.
+
+This drops the old updated_at index and gives existing sessions an expires_at
+of updated_at plus the idle time. Re-running is safe.
+
+Usage (from the backend directory, with MONGODB_URI set):
+    python -m migrations.chat_session_expiry [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+DB_NAME = "CVCompare"
+OLD_INDEX_NAME = "updated_at_1"
+
+
+async def migrate(db, idle_seconds: float, dry_run: bool = False) -> int:
+    sessions = db["chat_sessions"]
+    missing = {"expires_at": None}
+    if dry_run:
+        return await sessions.count_documents(missing)
+
+    if OLD_INDEX_NAME in await sessions.index_information():
+        await sessions.drop_index(OLD_INDEX_NAME)
+
+    result = await sessions.update_many(
+        missing,
+        [{"$set": {"expires_at": {"$add": ["$updated_at", int(idle_seconds * 1000)]}}}],
+    )
+    return result.modified_count
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    idle_seconds = float(os.getenv("CHAT_SESSION_IDLE_SECONDS", 30 * 60))
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+    try:
+        updated = await migrate(client[DB_NAME], idle_seconds, args.dry_run)
+        action = "Would set" if args.dry_run else "Set"
+        print(f"{action} expires_at on {updated} chat sessions")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
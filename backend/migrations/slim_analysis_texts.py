@@ -0,0 +1,97 @@
+"""
+One-off migration moving text copies out of analyses and the extraction cache.
+
+- Analyses stored without a job description snippet get jd_snippet, so
+  history pages no longer read full job descriptions from the text store.
+- Extraction cache entries drop their resume_text copy; the text is moved to
+  resume_texts first when no analysis stored it there.
+
+Safe to run with the API up and to re-run.
+
+Usage (from the backend directory, with MONGODB_URI set):
+    python -m migrations.slim_analysis_texts [--dry-run]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import zlib
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.resume import JD_SNIPPET_CHARS
+from app.text_store import encode_text
+
+DB_NAME = "CVCompare"
+
+
+def _decode(blob: dict) -> str:
+    if blob.get("compressed") is not None:
+        return zlib.decompress(blob["compressed"]).decode()
+    return blob.get("text") or ""
+
+
+async def add_jd_snippets(db, dry_run: bool = False) -> int:
+    """Set jd_snippet on analyses that have neither a snippet nor an inline job description."""
+    missing = {"jd_snippet": None, "job_description": None}
+    jd_hashes = await db["analyses"].distinct("jd_hash", missing)
+    if dry_run:
+        return await db["analyses"].count_documents(missing)
+
+    updated = 0
+    for jd_hash in jd_hashes:
+        blob = await db["job_descriptions"].find_one({"content_hash": jd_hash})
+        if blob is None:
+            continue
+        result = await db["analyses"].update_many(
+            {**missing, "jd_hash": jd_hash},
+            {"$set": {"jd_snippet": _decode(blob)[:JD_SNIPPET_CHARS]}},
+        )
+        updated += result.modified_count
+    return updated
+
+
+async def drop_cached_resume_texts(db, dry_run: bool = False) -> int:
+    """Remove resume_text from extraction cache entries, keeping one copy in resume_texts."""
+    cached = {"resume_text": {"$exists": True}}
+    if dry_run:
+        return await db["extracted_texts"].count_documents(cached)
+
+    moved = 0
+    async for entry in db["extracted_texts"].find(cached, {"resume_text": 1, "resume_hash": 1}):
+        await db["resume_texts"].update_one(
+            {"content_hash": entry["resume_hash"]},
+            {
+                "$setOnInsert": {
+                    "content_hash": entry["resume_hash"],
+                    "created_at": datetime.datetime.utcnow(),
+                    **encode_text(entry["resume_text"]),
+                }
+            },
+            upsert=True,
+        )
+        await db["extracted_texts"].update_one({"_id": entry["_id"]}, {"$unset": {"resume_text": ""}})
+        moved += 1
+    return moved
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+    try:
+        db = client[DB_NAME]
+        snippets = await add_jd_snippets(db, args.dry_run)
+        cached = await drop_cached_resume_texts(db, args.dry_run)
+        action = "Would update" if args.dry_run else "Updated"
+        print(f"{action} {snippets} analyses and {cached} extraction cache entries")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
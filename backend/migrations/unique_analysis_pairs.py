@@ -0,0 +1,88 @@
+"""
+One-off migration making (user_id, resume_hash, jd_hash) unique on analyses.
+
+Databases created before the unique index hold a non-unique index of the same
+name, and may hold duplicate analyses for a pair from double submissions.
+init_beanie does not replace existing indexes, so without this migration the
+API fails at startup with an index conflict.
+
+For each duplicated pair the most recent analysis is kept and the others are
+deleted. The old index is then dropped and the unique one built. Finally the
+analysis counters are recomputed, because deleting duplicates changes the
+totals.
+
+Run it with the API stopped, so no duplicate is inserted between the
+deduplication and the index build. Re-running is safe.
+
+Usage (from the backend directory, with MONGODB_URI set):
+    python -m migrations.unique_analysis_pairs [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from migrations.backfill_analysis_counters import backfill
+
+DB_NAME = "CVCompare"
+PAIR_KEYS = [("user_id", 1), ("resume_hash", 1), ("jd_hash", 1)]
+INDEX_NAME = "user_id_1_resume_hash_1_jd_hash_1"
+
+
+async def find_duplicates(db) -> list:
+    """Ids of every analysis that is not the most recent for its pair."""
+    groups = db["analyses"].aggregate(
+        [
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {
+                "$group": {
+                    "_id": {"user_id": "$user_id", "resume_hash": "$resume_hash", "jd_hash": "$jd_hash"},
+                    "ids": {"$push": "$_id"},
+                }
+            },
+            {"$match": {"ids.1": {"$exists": True}}},
+        ],
+        allowDiskUse=True,
+    )
+    return [analysis_id async for group in groups for analysis_id in group["ids"][1:]]
+
+
+async def migrate(db, dry_run: bool = False) -> int:
+    duplicates = await find_duplicates(db)
+    if dry_run:
+        return len(duplicates)
+
+    if duplicates:
+        await db["analyses"].delete_many({"_id": {"$in": duplicates}})
+
+    indexes = await db["analyses"].index_information()
+    existing = indexes.get(INDEX_NAME)
+    if existing is not None and not existing.get("unique"):
+        await db["analyses"].drop_index(INDEX_NAME)
+    await db["analyses"].create_index(PAIR_KEYS, name=INDEX_NAME, unique=True)
+
+    await backfill(db)
+    return len(duplicates)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+    try:
+        removed = await migrate(client[DB_NAME], args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {removed} duplicate analyses")
+        if not args.dry_run:
+            print(f"Unique index {INDEX_NAME} is in place")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+# Tests import the app package the same way uvicorn does, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mongo():
+    """
+    Run a coroutine against a scratch database initialised with the app's models.
+
+    Needs a MongoDB at MONGODB_TEST_URI; the database is dropped afterwards.
+    """
+    uri = os.getenv("MONGODB_TEST_URI")
+    if not uri:
+        pytest.skip("MONGODB_TEST_URI is not set")
+    pytest.importorskip("beanie")
+
+    from beanie import init_beanie
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from app.database import DOCUMENT_MODELS
+
+    def run(scenario):
+        async def wrapper():
+            client = AsyncIOMotorClient(uri)
+            db = client[f"cvcompare_test_{uuid.uuid4().hex[:8]}"]
+            try:
+                await init_beanie(database=db, document_models=DOCUMENT_MODELS)
+                return await scenario(db)
+            finally:
+                await client.drop_database(db.name)
+                client.close()
+
+        return asyncio.run(wrapper())
+
+    return run
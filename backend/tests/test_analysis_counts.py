@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("langchain")
+
+
+def make_analysis(user_id: str, i: int):
+    from app.models.resume import ResumeAnalysis
+
+    return ResumeAnalysis(
+        user_id=user_id,
+        resume_hash=f"resume{i}",
+        jd_hash=f"jd{i}",
+        analysis_result={},
+        resume_filename="resume.pdf",
+    )
+
+
+def test_counter_matches_analyses_under_interleaving(mongo):
+    from app.models.resume import ResumeAnalysis
+    from app.utils import get_analysis_count, increment_analysis_count
+
+    async def scenario(db):
+        async def analyse(i):
+            await make_analysis("user_a", i).insert()
+            await increment_analysis_count("user_a")
+
+        # Reads race the very first increments; none of them may seed a stale counter
+        await asyncio.gather(
+            *(analyse(i) for i in range(20)),
+            *(get_analysis_count("user_a") for _ in range(20)),
+        )
+
+        assert await ResumeAnalysis.find(ResumeAnalysis.user_id == "user_a").count() == 20
+        assert await get_analysis_count("user_a") == 20
+
+    mongo(scenario)
+
+
+def test_legacy_users_fall_back_until_backfilled(mongo):
+    from migrations.backfill_analysis_counters import backfill
+    from app.utils import get_analysis_count, increment_analysis_count
+
+    async def scenario(db):
+        for i in range(3):
+            await make_analysis("user_b", i).insert()
+        assert await get_analysis_count("user_b") == 3
+        # Reading must not create the counter
+        assert await db["analysis_counters"].count_documents({"user_id": "user_b"}) == 0
+
+        await make_analysis("user_b", 3).insert()
+        await increment_analysis_count("user_b")
+        assert await get_analysis_count("user_b") == 1
+
+        assert await backfill(db) == 1
+        assert await get_analysis_count("user_b") == 4
+
+    mongo(scenario)
@@ -0,0 +1,42 @@
+import base64
+import datetime
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("langchain")
+
+from beanie import PydanticObjectId
+
+from app.utils import decode_analysis_cursor, encode_analysis_cursor
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [
+        datetime.datetime(2026, 1, 2, 3, 4, 5),
+        # Mongo keeps milliseconds; the cursor must not round them away
+        datetime.datetime(2026, 1, 2, 3, 4, 5, 123000),
+    ],
+)
+def test_cursor_round_trip(created_at):
+    analysis_id = PydanticObjectId()
+    cursor = encode_analysis_cursor(created_at, analysis_id)
+
+    assert decode_analysis_cursor(cursor) == (created_at, analysis_id)
+    # Safe to pass as a query parameter unescaped
+    assert not set(cursor) & set("+/")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"2026-01-02T03:04:05").decode(),
+        base64.urlsafe_b64encode(b"yesterday|0123456789abcdef01234567").decode(),
+        base64.urlsafe_b64encode(b"2026-01-02T03:04:05|not-an-object-id").decode(),
+    ],
+)
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_analysis_cursor(cursor)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("langchain")
+
+
+def test_projected_read_and_score_update(mongo):
+    from app.models.resume import AnalysisDetails, AnalysisExists, ResumeAnalysis
+    from app.utils import analysis_exists, get_analysis_fields, update_analysis_score
+
+    async def scenario(db):
+        await ResumeAnalysis(
+            user_id="u",
+            resume_hash="r",
+            jd_hash="j",
+            analysis_result={"summary": "fit"},
+            resume_filename="resume.pdf",
+            resume_text="large resume text",
+        ).insert()
+
+        details = await get_analysis_fields("u", "r", "j", AnalysisDetails)
+        assert isinstance(details, AnalysisDetails)
+        assert details.analysis_result == {"summary": "fit"}
+        assert details.ats_score is None
+        assert isinstance(await get_analysis_fields("u", "r", "j", AnalysisExists), AnalysisExists)
+
+        assert await analysis_exists("u", "r", "j")
+        assert not await analysis_exists("other", "r", "j")
+
+        assert await update_analysis_score("u", "r", "j", 87.5, {"skills": 1.0})
+        assert not await update_analysis_score("other", "r", "j", 10, {})
+        details = await get_analysis_fields("u", "r", "j", AnalysisDetails)
+        assert details.ats_score == 87.5 and details.weights == {"skills": 1.0}
+
+    mongo(scenario)
+
+
+def test_analysis_exists_raises_database_errors(monkeypatch):
+    from app import utils
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(utils, "get_analysis_fields", unavailable)
+    with pytest.raises(ConnectionError):
+        asyncio.run(utils.analysis_exists("u", "r", "j"))
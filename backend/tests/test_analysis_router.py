@@ -0,0 +1,54 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("beanie")
+pytest.importorskip("langchain")
+
+from app.analysis_jobs import AnalysisJobs
+from app.router import analysis
+
+
+class FakeIndexer:
+    async def wait_until_indexed(self, user_id, resume_hash, jd_hash, timeout=None):
+        return True
+
+
+def make_request():
+    return types.SimpleNamespace(
+        state=types.SimpleNamespace(_state={"user_id": "user_a"}),
+        app=types.SimpleNamespace(
+            state=types.SimpleNamespace(analysis_jobs=AnalysisJobs(), indexer=FakeIndexer())
+        ),
+    )
+
+
+def test_job_and_direct_submissions_share_one_analysis(monkeypatch):
+    runs = []
+
+    async def fake_run_analysis(request, user_id, job_description, file_url, file_name, jd_hash, progress=None):
+        runs.append(file_url)
+        await asyncio.sleep(0.05)
+        return {"resume_hash": "r", "jd_hash": jd_hash, "cached": False}
+
+    monkeypatch.setattr(analysis, "run_analysis", fake_run_analysis)
+    request = make_request()
+    form = dict(job_description="Python developer", file_url="https://files.test/cv.pdf", file_name="cv.pdf")
+
+    async def scenario():
+        direct = asyncio.create_task(analysis.analyze_resume(request, **form))
+        await asyncio.sleep(0)
+        submitted = await analysis.submit_analysis_job(request, **form)
+        assert (await direct)["cached"] is False
+
+        job = request.app.state.analysis_jobs.get(submitted["job_id"], "user_a")
+        while not job.done:
+            await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(scenario())
+    assert runs == ["https://files.test/cv.pdf"]
+    assert job.result["cached"] is True
+    assert [event["event"] for event in job.events] == ["analyzed", "indexed", "done"]
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+jwt = pytest.importorskip("jwt")
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+
+from app.middleware.auth_cache import JWKSCache, JWKSError, VerifiedTokenCache
+
+URL = "https://jwks.test/.well-known/jwks.json"
+
+
+def make_jwks(kid="key-1"):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return {"keys": [jwk]}
+
+
+class FlakyJWKS:
+    """JWKS endpoint stand-in that can be switched into a slow outage."""
+
+    def __init__(self, jwks):
+        self.jwks = jwks
+        self.down = False
+        self.calls = 0
+
+    async def handler(self, request):
+        self.calls += 1
+        if self.down:
+            await asyncio.sleep(0.05)
+            raise httpx.ConnectError("JWKS endpoint unreachable")
+        return httpx.Response(200, json=self.jwks)
+
+
+def make_cache(endpoint, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint.handler))
+    return JWKSCache(URL, client, **kwargs)
+
+
+def test_outage_serves_stale_key_with_a_single_fetch():
+    endpoint = FlakyJWKS(make_jwks())
+
+    async def scenario():
+        # ttl=0: every lookup after the first fetch sees a stale key
+        cache = make_cache(endpoint, ttl=0, min_refetch_interval=0.5)
+        try:
+            key = await cache.get_signing_key("key-1")
+            await asyncio.sleep(0.6)
+            endpoint.down = True
+
+            keys = await asyncio.gather(*(cache.get_signing_key("key-1") for _ in range(20)))
+            assert all(k is key for k in keys)
+            assert endpoint.calls == 2
+
+            # Within min_refetch_interval of the failure, no fetch and no waiting
+            started = time.perf_counter()
+            assert await cache.get_signing_key("key-1") is key
+            assert time.perf_counter() - started < 0.05
+            assert endpoint.calls == 2
+
+            with pytest.raises(JWKSError):
+                await cache.get_signing_key("unknown")
+            assert endpoint.calls == 2
+        finally:
+            await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_kid_refetches_once_then_is_rate_limited():
+    endpoint = FlakyJWKS(make_jwks())
+
+    async def scenario():
+        cache = make_cache(endpoint, min_refetch_interval=30)
+        try:
+            await cache.get_signing_key("key-1")
+            for _ in range(2):
+                with pytest.raises(JWKSError):
+                    await cache.get_signing_key("rotated")
+            assert endpoint.calls == 1
+        finally:
+            await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_verified_tokens_expire_at_exp():
+    cache = VerifiedTokenCache(max_entries=2, max_ttl=300)
+    cache.put("live", {"sub": "a", "exp": time.time() + 60})
+    cache.put("expired", {"sub": "b", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "c"})
+
+    assert cache.get("live") == {"sub": "a", "exp": pytest.approx(time.time() + 60, abs=5)}
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.downloads import DownloadTooLargeError, FileDownloader
+
+URL = "https://files.test/resume.pdf"
+
+
+class FileServer:
+    """Upload host stand-in that honours If-None-Match."""
+
+    def __init__(self, content=b"%PDF-1 v1", etag='"v1"'):
+        self.content = content
+        self.etag = etag
+        self.requests = []
+        self.chunks_sent = 0
+
+    async def handler(self, request):
+        self.requests.append(request)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, content=self.content, headers=headers)
+
+    async def streaming_handler(self, request):
+        """Streams a 1 MB body in 1 KB chunks without a Content-Length."""
+        self.requests.append(request)
+
+        async def body():
+            for _ in range(1024):
+                self.chunks_sent += 1
+                yield b"x" * 1024
+
+        return httpx.Response(200, content=body())
+
+
+def make_downloader(handler, **kwargs):
+    return FileDownloader(httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_declared_oversized_body_is_rejected():
+    server = FileServer(content=b"x" * 2048)
+    downloader = make_downloader(server.handler, max_bytes=1024)
+
+    with pytest.raises(DownloadTooLargeError):
+        asyncio.run(downloader.fetch(URL))
+    assert downloader.stats["cached_files"] == 0
+
+
+def test_streamed_body_is_abandoned_past_the_limit():
+    server = FileServer()
+    downloader = make_downloader(server.streaming_handler, max_bytes=4096)
+
+    with pytest.raises(DownloadTooLargeError):
+        asyncio.run(downloader.fetch(URL))
+    # Reading stops near the limit instead of draining the body
+    assert server.chunks_sent < 10
+
+
+def test_unchanged_file_is_revalidated_not_refetched():
+    server = FileServer()
+    downloader = make_downloader(server.handler)
+
+    async def scenario():
+        assert await downloader.fetch(URL) == b"%PDF-1 v1"
+        assert await downloader.fetch(URL) == b"%PDF-1 v1"
+
+    asyncio.run(scenario())
+    assert server.requests[1].headers["If-None-Match"] == '"v1"'
+    assert downloader.stats["revalidated"] == 1 and downloader.stats["misses"] == 1
+
+
+def test_changed_etag_refetches_and_replaces_the_cache():
+    server = FileServer()
+    downloader = make_downloader(server.handler)
+
+    async def scenario():
+        assert await downloader.fetch(URL) == b"%PDF-1 v1"
+        server.content, server.etag = b"%PDF-1 v2", '"v2"'
+        assert await downloader.fetch(URL) == b"%PDF-1 v2"
+        # The new version is what gets revalidated next
+        assert await downloader.fetch(URL) == b"%PDF-1 v2"
+
+    asyncio.run(scenario())
+    assert server.requests[2].headers["If-None-Match"] == '"v2"'
+    assert downloader.stats["misses"] == 2 and downloader.stats["revalidated"] == 1
+
+
+def test_too_large_maps_to_413():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("langchain")
+    from fastapi import HTTPException
+
+    from app.utils import download_file_from_url
+
+    downloader = make_downloader(FileServer(content=b"x" * 2048).handler, max_bytes=1024)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(download_file_from_url(URL, downloader))
+    assert excinfo.value.status_code == 413
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.embeddings import Embeddings
+
+from app.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    model_name = "counting"
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def rows(cache):
+    (count,) = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    return count
+
+
+def test_repeated_chunks_are_served_from_the_cache(tmp_path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, str(tmp_path / "cache.db"), "ns")
+
+    assert cache.embed_documents(["a", "bb", "a"]) == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert cache.embed_documents(["bb", "ccc"]) == [[2.0, 1.0], [3.0, 1.0]]
+    assert inner.embedded == ["a", "bb", "ccc"]
+    assert cache._count == rows(cache) == 3
+
+
+def test_eviction_keeps_the_row_count_in_step(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = CachedEmbeddings(CountingEmbeddings(), path, "ns", max_entries=10)
+
+    for i in range(25):
+        cache.embed_documents([f"text {i}"])
+        assert cache._count == rows(cache) <= 10
+
+    # Recently used entries survive eviction
+    assert cache._lookup([cache._key("text 24")])
+    assert not cache._lookup([cache._key("text 0")])
+    cache.close()
+
+    # The count is read once when the file is reopened
+    reopened = CachedEmbeddings(CountingEmbeddings(), path, "ns", max_entries=10)
+    assert reopened._count == rows(reopened)
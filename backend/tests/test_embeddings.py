@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from app.embeddings import BatchingEmbeddings
+
+
+class _Vectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class BlockingModel:
+    """Encodes each text as [len(text)], waiting for ``release`` on the first batch."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        self.started.set()
+        self.release.wait(5)
+        return _Vectors([float(len(text))] for text in texts)
+
+
+def test_cancelled_callers_do_not_stop_the_batcher():
+    model = BlockingModel()
+    embeddings = BatchingEmbeddings(model, "fake", max_wait_ms=1)
+
+    async def scenario():
+        # Cancelled while its batch is being encoded
+        in_batch = asyncio.create_task(embeddings.aembed_query("hello"))
+        await asyncio.to_thread(model.started.wait, 5)
+
+        # Cancelled while still queued behind that batch
+        queued = asyncio.create_task(embeddings.aembed_query("queued"))
+        await asyncio.sleep(0.01)
+
+        in_batch.cancel()
+        queued.cancel()
+        model.release.set()
+
+        for task in (in_batch, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        return await asyncio.wait_for(embeddings.aembed_query("again"), 5)
+
+    assert asyncio.run(scenario()) == [5.0]
+    assert embeddings.embed_documents(["a", "bb"]) == [[1.0], [2.0]]
+
+
+def test_failed_batch_reports_error_and_keeps_serving():
+    class FlakyModel:
+        def __init__(self):
+            self.failed = False
+
+        def encode(self, texts, **kwargs):
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("boom")
+            return _Vectors([1.0] for _ in texts)
+
+    embeddings = BatchingEmbeddings(FlakyModel(), "fake", max_wait_ms=1)
+
+    with pytest.raises(RuntimeError):
+        embeddings.embed_query("x")
+    assert embeddings.embed_query("y") == [1.0]
+
+
+def test_newlines_are_folded_like_huggingface_embeddings():
+    class RecordingModel:
+        def __init__(self):
+            self.texts = []
+
+        def encode(self, texts, **kwargs):
+            self.texts.extend(texts)
+            return _Vectors([0.0] for _ in texts)
+
+    model = RecordingModel()
+    embeddings = BatchingEmbeddings(model, "fake", max_wait_ms=1)
+    embeddings.embed_documents(["line one\nline two"])
+
+    assert model.texts == ["line one line two"]
+
+
+def test_cache_namespace_includes_the_onnx_file(monkeypatch, tmp_path):
+    from app import embeddings as embeddings_module
+
+    monkeypatch.setattr(embeddings_module, "load_sentence_transformer", lambda *args, **kwargs: BlockingModel())
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("EMBEDDING_BACKEND", "onnx-int8")
+
+    def namespace(onnx_file=None):
+        if onnx_file:
+            monkeypatch.setenv("EMBEDDING_ONNX_FILE", onnx_file)
+        else:
+            monkeypatch.delenv("EMBEDDING_ONNX_FILE", raising=False)
+        cache = embeddings_module.get_local_embeddings()
+        cache.close()
+        return cache.namespace
+
+    default = namespace()
+    assert "onnx/model_qint8_avx512.onnx" in default
+    assert namespace("onnx/model_qint8_avx512.onnx") == default
+    assert namespace("onnx/model_qint8_avx2.onnx") != default
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beanie")
+
+from app.extraction_cache import ExtractionCache
+
+
+def test_persistent_tier_keeps_the_most_recently_used_entries(mongo):
+    from app.models.extraction import ExtractedText
+
+    async def scenario(db):
+        cache = ExtractionCache(max_persistent_entries=3)
+        for i in range(3):
+            await cache.put(f"file{i}", f"text {i}", f"resume{i}")
+            await asyncio.sleep(0.005)
+
+        # Touch the oldest entry so file1 becomes least recently used
+        await cache.put("file0", "text 0", "resume0")
+        await asyncio.sleep(0.005)
+        await cache.put("file3", "text 3", "resume3")
+
+        stored = {doc.file_hash for doc in await ExtractedText.find_all().to_list()}
+        assert stored == {"file0", "file2", "file3"}
+
+    mongo(scenario)
+
+
+def test_memory_tier_is_bounded_by_text_bytes():
+    cache = ExtractionCache(max_memory_bytes=10)
+    cache._remember("a", "x" * 6, "ha")
+    cache._remember("b", "y" * 6, "hb")
+
+    assert list(cache._entries) == ["b"]
+    assert cache.stats["memory_bytes"] == 6
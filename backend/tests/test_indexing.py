@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("langchain")
+
+
+class BrokenStore:
+    """Vector store loader whose store never becomes available."""
+
+    async def get(self):
+        raise RuntimeError("vector store unavailable")
+
+
+def stale_analysis(i: int):
+    from app.models.resume import IndexStatus, ResumeAnalysis
+
+    return ResumeAnalysis(
+        user_id="user_a",
+        resume_hash=f"resume{i}",
+        jd_hash=f"jd{i}",
+        analysis_result={},
+        resume_filename="resume.pdf",
+        resume_text="resume",
+        job_description="job",
+        index_status=IndexStatus.PENDING,
+        created_at=datetime.datetime.utcnow() - datetime.timedelta(hours=1),
+    )
+
+
+def test_each_stale_job_is_claimed_by_one_worker(mongo):
+    from app.indexing import IndexingQueue
+    from app.models.resume import IndexStatus, ResumeAnalysis
+
+    async def scenario(db):
+        for i in range(10):
+            await stale_analysis(i).insert()
+
+        queues = [IndexingQueue(BrokenStore()) for _ in range(3)]
+        await asyncio.gather(*(queue.recover() for queue in queues))
+
+        assert sum(queue._queue.qsize() for queue in queues) == 10
+        claims = await ResumeAnalysis.find(ResumeAnalysis.index_status == IndexStatus.INDEXING).to_list()
+        assert len(claims) == 10
+        assert {claim.index_owner for claim in claims} <= {queue.owner for queue in queues}
+
+    mongo(scenario)
+
+
+def test_failed_jobs_retry_with_backoff_until_attempts_run_out(mongo):
+    from app.indexing import IndexingQueue
+    from app.models.resume import IndexStatus, ResumeAnalysis
+
+    async def scenario(db):
+        analysis = await stale_analysis(0).insert()
+        queue = IndexingQueue(BrokenStore(), max_attempts=2, retry_backoff=60, sweep_interval=3600)
+        queue.start()
+        try:
+            for attempt in (1, 2):
+                await queue.recover()
+                await queue._queue.join()
+                record = await ResumeAnalysis.get(analysis.id)
+                assert record.index_status == IndexStatus.FAILED
+                assert record.index_attempts == attempt
+
+                if attempt == 1:
+                    assert record.index_retry_at > datetime.datetime.utcnow()
+                    # Not due yet, so nothing is claimed
+                    await queue.recover()
+                    assert queue._queue.qsize() == 0
+                    await ResumeAnalysis.find_one(ResumeAnalysis.id == analysis.id).update(
+                        {"$set": {"index_retry_at": datetime.datetime.utcnow()}}
+                    )
+                else:
+                    assert record.index_retry_at is None
+
+            await queue.recover()
+            assert queue._queue.qsize() == 0
+        finally:
+            await queue.stop()
+
+    mongo(scenario)
@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("dotenv")
+
+
+def test_unique_pair_migration_keeps_the_latest_analysis(mongo):
+    from migrations.unique_analysis_pairs import INDEX_NAME, PAIR_KEYS, migrate
+
+    async def scenario(db):
+        analyses = db["analyses"]
+        # Recreate a database from before the unique index
+        await analyses.drop_index(INDEX_NAME)
+        await analyses.create_index(PAIR_KEYS, name=INDEX_NAME)
+
+        now = datetime.datetime.utcnow()
+        await analyses.insert_many(
+            [
+                {"user_id": "u", "resume_hash": "r", "jd_hash": "j", "created_at": now - datetime.timedelta(minutes=2)},
+                {"user_id": "u", "resume_hash": "r", "jd_hash": "j", "created_at": now, "latest": True},
+                {"user_id": "u", "resume_hash": "r", "jd_hash": "other", "created_at": now},
+            ]
+        )
+
+        assert await migrate(db, dry_run=True) == 1
+        assert await analyses.count_documents({}) == 3
+
+        assert await migrate(db) == 1
+        kept = await analyses.find({"jd_hash": "j"}).to_list(None)
+        assert len(kept) == 1 and kept[0].get("latest")
+        assert (await analyses.index_information())[INDEX_NAME].get("unique")
+        assert (await db["analysis_counters"].find_one({"user_id": "u"}))["count"] == 2
+
+        # Re-running is a no-op
+        assert await migrate(db) == 0
+
+    mongo(scenario)
+
+
+def test_chat_session_expiry_migration(mongo):
+    from migrations.chat_session_expiry import OLD_INDEX_NAME, migrate
+
+    async def scenario(db):
+        sessions = db["chat_sessions"]
+        await sessions.create_index([("updated_at", 1)], name=OLD_INDEX_NAME, expireAfterSeconds=1800)
+        updated_at = datetime.datetime(2026, 1, 1)
+        await sessions.insert_one({"session_key": "k", "messages": [], "updated_at": updated_at})
+
+        assert await migrate(db, 600) == 1
+        session = await sessions.find_one({"session_key": "k"})
+        assert session["expires_at"] == updated_at + datetime.timedelta(seconds=600)
+        assert OLD_INDEX_NAME not in await sessions.index_information()
+
+        assert await migrate(db, 600) == 0
+
+    mongo(scenario)
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+
+import pytest
+
+pytest.importorskip("pypdf")
+
+from app.pdf_extraction import PDFExtractor, PDFLimitError
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one text line per entry of each page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    page_ids = []
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for lines in pages:
+        ops = ["BT /F1 12 Tf 72 720 Td 14 TL"]
+        ops += [f"({line}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        page_ids.append(len(objects))
+
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+RESUME_PAGES = [
+    ["Jane Doe", "Senior Python Engineer", "   "],
+    ["Experience", "FastAPI, MongoDB, LangChain", ""],
+]
+
+
+def extract(data, **kwargs):
+    extractor = PDFExtractor(max_workers=1, **kwargs)
+    try:
+        return asyncio.run(extractor.extract(data))
+    finally:
+        extractor.shutdown()
+
+
+def test_pages_are_stripped_and_joined_like_pypdfloader():
+    text = extract(make_pdf(RESUME_PAGES))
+
+    pages = text.split("\n\f")
+    assert len(pages) == 2
+    assert all(page == page.strip() for page in pages)
+    assert pages[0].startswith("Jane Doe")
+
+
+def test_resume_hash_matches_pypdfloader(tmp_path):
+    loaders = pytest.importorskip("langchain_community.document_loaders")
+
+    data = make_pdf(RESUME_PAGES)
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(data)
+
+    documents = loaders.PyPDFLoader(str(path), mode="single", extract_images=False).load()
+    expected = hashlib.md5(documents[0].page_content.encode()).hexdigest()
+
+    assert hashlib.md5(extract(data).encode()).hexdigest() == expected
+
+
+def test_page_limit():
+    with pytest.raises(PDFLimitError):
+        extract(make_pdf([["one"], ["two"], ["three"]]), max_pages=2)
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("jwt")
+pytest.importorskip("httpx")
+
+from app.middleware.authMiddleware import PUBLIC, REQUIRED, ROUTE_POLICIES, compile_route_policies
+
+
+@pytest.mark.parametrize(
+    "path, policy",
+    [
+        ("/", PUBLIC),
+        ("/health", PUBLIC),
+        ("/health/ready", PUBLIC),
+        ("/webhooks/clerk", PUBLIC),
+        ("/openapi.json", PUBLIC),
+        # Prefixes stop at segment boundaries
+        ("/healthz", REQUIRED),
+        ("/docsearch", REQUIRED),
+        ("/openapi.jsonp", REQUIRED),
+        # "/" is exact, not a prefix of everything
+        ("/analysis/get-analysis", REQUIRED),
+        ("//", REQUIRED),
+        ("", REQUIRED),
+    ],
+)
+def test_default_policies(path, policy):
+    assert compile_route_policies(ROUTE_POLICIES)(path) == policy
+
+
+def test_longest_prefix_wins():
+    policy_for = compile_route_policies({"/api": PUBLIC, "/api/private": REQUIRED}, default="other")
+
+    assert policy_for("/api/public") == PUBLIC
+    assert policy_for("/api/private") == REQUIRED
+    assert policy_for("/api/private/x") == REQUIRED
+    assert policy_for("/api/privateer") == PUBLIC
+    assert policy_for("/elsewhere") == "other"
+
+
+def test_special_characters_are_literal():
+    policy_for = compile_route_policies({"/a.b": PUBLIC})
+
+    assert policy_for("/a.b/c") == PUBLIC
+    assert policy_for("/axb") == REQUIRED
+
+
+def test_root_only_policies():
+    policy_for = compile_route_policies({"/": PUBLIC})
+
+    assert policy_for("/") == PUBLIC
+    assert policy_for("/anything") == REQUIRED
@@ -0,0 +1,82 @@
+import types
+
+import pytest
+
+from app import session_cache
+from app.session_cache import SESSION_OVERHEAD_BYTES, SessionCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_cache.time, "monotonic", clock)
+    return clock
+
+
+def session(*messages: str) -> dict:
+    return {"chat_history": [types.SimpleNamespace(content=m) for m in messages]}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SessionCache(max_entries=2)
+    cache.put("a", session())
+    cache.put("b", session())
+    assert cache.get("a") is not None
+
+    cache.put("c", session())
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.stats["evictions"] == 1
+
+
+def test_idle_entries_expire(clock):
+    cache = SessionCache(idle_ttl=60)
+    cache.put("a", session())
+    cache.put("b", session())
+
+    clock.now += 30
+    assert cache.get("a") is not None
+
+    clock.now += 45
+    # "b" was idle for 75s, "a" for 45s
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats["expirations"] == 1
+
+
+def test_weight_bounds_the_cache_and_follows_history(clock):
+    cache = SessionCache(max_weight=2 * SESSION_OVERHEAD_BYTES + 100)
+    cache.put("a", session("x" * 50))
+    cache.put("b", session("y" * 40))
+    assert cache.stats["weight_bytes"] == 2 * SESSION_OVERHEAD_BYTES + 90
+
+    # Growing "b" past the limit evicts "a", never the entry being written
+    cache.get("b")["chat_history"].append(types.SimpleNamespace(content="z" * 100))
+    cache.reweigh("b")
+    assert "a" not in cache and "b" in cache
+    assert cache.stats["weight_bytes"] == SESSION_OVERHEAD_BYTES + 140
+
+
+def test_oversized_session_is_still_kept(clock):
+    cache = SessionCache(max_weight=10)
+    cache.put("a", session("x" * 1000))
+    assert cache.get("a") is not None
+
+
+def test_hit_rate_and_invalidate(clock):
+    cache = SessionCache()
+    cache.put("a", session())
+    cache.get("a")
+    cache.get("missing")
+    assert cache.stats["hit_rate"] == 0.5
+
+    cache.invalidate("a")
+    assert "a" not in cache and cache.stats["weight_bytes"] == 0
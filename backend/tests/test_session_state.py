@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("beanie")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.session_cache import SessionCache
+from app.session_state import HISTORY_WINDOW, InProcessSessionState, SessionState
+
+
+def test_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        SessionState()
+
+    class Partial(SessionState):
+        async def get_history(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_in_process_history_keeps_the_latest_window():
+    state = InProcessSessionState(SessionCache())
+
+    async def scenario():
+        assert await state.get_history("k") is None
+        # Appending to an unseeded conversation is ignored until it is loaded
+        await state.append("k", [HumanMessage(content="lost")])
+        assert await state.get_history("k") is None
+
+        await state.set_history("k", [HumanMessage(content="q0"), AIMessage(content="a0")])
+        for i in range(1, HISTORY_WINDOW):
+            await state.append("k", [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")])
+
+        history = await state.get_history("k")
+        assert len(history) == HISTORY_WINDOW
+        assert history[-1].content == f"a{HISTORY_WINDOW - 1}"
+
+        await state.invalidate("k")
+        assert await state.get_history("k") is None
+
+    asyncio.run(scenario())
+
+
+def test_mongo_sessions_expire_after_their_own_idle_time(mongo):
+    from app.models.chat import ChatSessionState
+    from app.session_state import MongoSessionState
+
+    state = MongoSessionState(idle_ttl=60)
+
+    async def scenario(db):
+        await state.set_history("k", [HumanMessage(content="q0")])
+        first = await ChatSessionState.find_one(ChatSessionState.session_key == "k")
+        assert (first.expires_at - first.updated_at).total_seconds() == pytest.approx(60, abs=0.01)
+
+        await asyncio.sleep(0.01)
+        await state.append("k", [AIMessage(content="a0")])
+        second = await ChatSessionState.find_one(ChatSessionState.session_key == "k")
+        assert second.expires_at > first.expires_at
+
+        ttl = (await db["chat_sessions"].index_information())["expires_at_1"]
+        assert ttl["expireAfterSeconds"] == 0
+
+    mongo(scenario)
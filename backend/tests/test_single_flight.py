@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        assert calls == 1
+        assert [result for result, _ in results] == [1] * 5
+        assert [shared for _, shared in results] == [False] + [True] * 4
+        assert "key" not in flight
+
+        # Once finished, the next call computes again
+        assert await flight.do("key", compute) == (2, False)
+
+    asyncio.run(scenario())
+
+
+def test_keys_are_independent():
+    flight = SingleFlight()
+
+    async def scenario():
+        async def value(v):
+            await asyncio.sleep(0.01)
+            return v
+
+        results = await asyncio.gather(flight.do("a", lambda: value("a")), flight.do("b", lambda: value("b")))
+        assert results == [("a", False), ("b", False)]
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "key" not in flight
+
+    asyncio.run(scenario())
+
+
+def test_computation_survives_the_caller_being_cancelled():
+    flight = SingleFlight()
+
+    async def scenario():
+        done = asyncio.Event()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            done.set()
+            return "stored"
+
+        first = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        assert await second == ("stored", True)
+        assert done.is_set()
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+import types
+
+import pytest
+
+pytest.importorskip("beanie")
+
+from app import text_store
+from app.text_store import decode_text, encode_text
+
+
+def as_blob(fields: dict):
+    return types.SimpleNamespace(**fields)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "short résumé ✓", "line\n" * 5000, "".join(chr(0x4E00 + i % 500) for i in range(3000))],
+)
+def test_round_trip(text):
+    fields = encode_text(text)
+    assert fields["size"] == len(text.encode())
+    assert decode_text(as_blob(fields)) == text
+
+
+def test_compresses_only_large_texts_that_shrink(monkeypatch):
+    monkeypatch.setattr(text_store, "COMPRESS_MIN_BYTES", 64)
+
+    small = encode_text("x" * 10)
+    assert small["compressed"] is None and small["text"] == "x" * 10
+
+    repetitive = encode_text("skill " * 100)
+    assert repetitive["text"] is None and repetitive["compressed"] is not None
+
+
+def test_history_snippets_and_resume_text_come_from_one_store(mongo):
+    pytest.importorskip("langchain")
+    from app.extraction_cache import ExtractionCache
+    from app.models.resume import JD_SNIPPET_CHARS, ResumeAnalysis
+    from app.utils import get_user_analyses_from_db
+
+    async def scenario(db):
+        job_description = "j" * (JD_SNIPPET_CHARS * 5)
+        await text_store.put_texts("r", "resume text", "jd", job_description)
+        await ResumeAnalysis(
+            user_id="u",
+            resume_hash="r",
+            jd_hash="jd",
+            analysis_result={},
+            resume_filename="resume.pdf",
+            jd_snippet=job_description[:JD_SNIPPET_CHARS],
+        ).insert()
+
+        rows, _ = await get_user_analyses_from_db("u", limit=10, jd="snippet")
+        assert rows[0].job_description == job_description[:JD_SNIPPET_CHARS]
+
+        cache = ExtractionCache()
+        await cache.put("file", "resume text", "r")
+        stored = await db["extracted_texts"].find_one({"file_hash": "file"})
+        assert "resume_text" not in stored
+
+        # A fresh process reads the text back from resume_texts
+        assert await ExtractionCache().get("file") == ("resume text", "r")
+        await cache.put("other", "unsaved text", "unsaved")
+        assert await ExtractionCache().get("other") is None
+
+    mongo(scenario)
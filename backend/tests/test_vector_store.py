@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("langchain_chroma")
+
+from app import vector_store
+from app.vector_store import has_content, mark_content_indexed
+
+
+class FakeStore:
+    """Vector store answering metadata lookups from a set of stored hashes."""
+
+    def __init__(self, stored):
+        self.stored = set(stored)
+        self.lookups = 0
+
+    def get(self, where, limit, include):
+        self.lookups += 1
+        content_hash = where["$and"][2]["content_hash"]["$eq"]
+        return {"ids": ["chunk"] if content_hash in self.stored else []}
+
+
+@pytest.fixture(autouse=True)
+def small_cache(monkeypatch):
+    monkeypatch.setattr(vector_store, "INDEXED_CONTENT_CACHE_SIZE", 2)
+    vector_store._indexed_content.clear()
+    yield
+    vector_store._indexed_content.clear()
+
+
+def test_positive_lookups_are_remembered_up_to_the_bound():
+    store = FakeStore({"a", "b", "c"})
+
+    assert has_content(store, "u", "resume", "a")
+    assert has_content(store, "u", "resume", "a")
+    assert store.lookups == 1
+
+    # Misses are not remembered
+    assert not has_content(store, "u", "resume", "missing")
+    assert not has_content(store, "u", "resume", "missing")
+    assert store.lookups == 3
+
+    has_content(store, "u", "resume", "b")
+    has_content(store, "u", "resume", "c")
+    assert len(vector_store._indexed_content) == 2
+
+    # "a" was least recently used, so it is looked up again
+    has_content(store, "u", "resume", "a")
+    assert store.lookups == 6
+
+
+def test_marked_content_skips_the_lookup():
+    store = FakeStore(set())
+    mark_content_indexed("u", "job_description", "j")
+    assert has_content(store, "u", "job_description", "j")
+    assert store.lookups == 0